@@ -0,0 +1,101 @@
+"""
+JWT authentication without a users query on every request.
+
+Users are cached in-process for AUTH_USER_CACHE_SECONDS, keyed by user id
+and the token_version claim. Saving or deleting a user drops the entry in
+the process that made the change; other processes see the change once
+their entry expires, so keep the TTL short.
+
+With AUTH_STATELESS_USERS, no lookup happens at all: request.user is built
+from the token claims. Deactivating a user or changing their role then
+only takes effect when their access token expires.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Past this many entries, expired ones are swept out on the next insert
+MAX_ENTRIES = 10000
+
+
+class UserCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        cached_version, expires, user = entry
+        if cached_version != version or expires < time.monotonic():
+            return None
+        return user
+
+    def set(self, user_id, version, user):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.entries) >= MAX_ENTRIES:
+                self.entries = {key: entry for key, entry in self.entries.items() if entry[1] >= now}
+            self.entries[user_id] = (version, now + settings.AUTH_USER_CACHE_SECONDS, user)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+user_cache = UserCache()
+
+
+class ClaimsUser(TokenUser):
+    """request.user built from the access token's claims alone."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', User.Role.MEMBER)
+
+    @cached_property
+    def is_staff(self):
+        return self.token.get('is_staff', False)
+
+    @cached_property
+    def is_superuser(self):
+        return self.token.get('is_superuser', False)
+
+    def is_bishop(self):
+        return self.role == User.Role.BISHOP
+
+    def is_admin(self):
+        return self.role in [User.Role.BISHOP, User.Role.ADMIN]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if settings.AUTH_STATELESS_USERS:
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken('Token contained no recognizable user identification')
+            return ClaimsUser(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        version = validated_token.get('token_version', 0)
+        user = user_cache.get(str(user_id), version)
+        if user is None:
+            user = super().get_user(validated_token)
+            if user.token_version != version:
+                raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+            user_cache.set(str(user_id), version, user)
+        # Each request gets its own instance to modify
+        return copy.copy(user)
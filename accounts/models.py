@@ -11,6 +11,35 @@ class User(AbstractUser):
 
     role = models.CharField(max_length=20, choices=Role.choices, default=Role.MEMBER)
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # Carried in access tokens; bumping it revokes every token issued before
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        if self.pk is not None and not getattr(self, '_rehashing', False):
+            self.token_version += 1
+
+    def check_password(self, raw_password):
+        # A correct password stored with outdated hasher settings is
+        # re-hashed through set_password; that is no password change
+        self._rehashing = True
+        try:
+            return super().check_password(raw_password)
+        finally:
+            self._rehashing = False
+
+    async def acheck_password(self, raw_password):
+        self._rehashing = True
+        try:
+            return await super().acheck_password(raw_password)
+        finally:
+            self._rehashing = False
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'password' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
 
     def is_bishop(self):
         return self.role == self.Role.BISHOP
@@ -0,0 +1,74 @@
+"""
+Row scoping by role.
+
+Bishops, admins, data-entry clerks (who register members and run check-in
+for the whole church) and staff see every row. Ministry leaders see the
+members of the ministries they lead, and the attendance and follow-ups of
+those members. Everyone else sees no member data.
+
+The scope is resolved once per request (one query for a leader's
+ministries) and applied as a `main_ministry_id IN (...)` filter, which the
+member indexes serve.
+"""
+from rest_framework import permissions
+
+from ministries.models import Ministry
+from .models import User
+
+FULL_ACCESS_ROLES = (User.Role.BISHOP, User.Role.ADMIN, User.Role.DATA_ENTRY)
+
+
+class Scope:
+    def __init__(self, ministry_ids=None):
+        # None: every member
+        self.ministry_ids = ministry_ids
+
+    @property
+    def is_full(self):
+        return self.ministry_ids is None
+
+    def filter(self, queryset, path=''):
+        """
+        Limit `queryset` to the scope. `path` leads from its model to Member
+        ('' for members, 'member__' for attendance); None marks rows not tied
+        to a member, such as visitors, which only full scopes see.
+        """
+        if self.is_full:
+            return queryset
+        if path is None:
+            return queryset.none()
+        return queryset.filter(**{f'{path}main_ministry_id__in': self.ministry_ids})
+
+
+def resolve_scope(user):
+    if not user.is_authenticated:
+        return Scope([])
+    if user.is_superuser or user.is_staff or getattr(user, 'role', None) in FULL_ACCESS_ROLES:
+        return Scope()
+    if user.role == User.Role.MINISTRY_LEADER:
+        return Scope(list(Ministry.objects.filter(leader_id=user.pk).values_list('pk', flat=True)))
+    return Scope([])
+
+
+def get_scope(request):
+    """The caller's scope, resolved on first use and kept on the request."""
+    scope = getattr(request, '_row_scope', None)
+    if scope is None:
+        scope = request._row_scope = resolve_scope(request.user)
+    return scope
+
+
+class RowScopeMixin:
+    """ViewSet mixin limiting rows to the caller's scope; see Scope.filter for `scope_path`."""
+    scope_path = ''
+
+    def get_queryset(self):
+        return get_scope(self.request).filter(super().get_queryset(), self.scope_path)
+
+
+class HasFullScope(permissions.BasePermission):
+    """Church-wide endpoints, such as reports, that cannot be narrowed to a scope."""
+    message = 'Only church-wide roles can use this endpoint.'
+
+    def has_permission(self, request, view):
+        return get_scope(request).is_full
@@ -15,4 +15,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Add custom claims
         token['role'] = user.role
         token['username'] = user.username
+        token['token_version'] = user.token_version
+        # Read instead of the database when AUTH_STATELESS_USERS is on
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
         return token
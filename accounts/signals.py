@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from .authentication import user_cache
+from .models import User
+
+
+def forget_user(sender, instance, **kwargs):
+    user_cache.invalidate(str(instance.pk))
+
+
+post_save.connect(forget_user, sender=User, dispatch_uid='accounts_forget_user_save')
+post_delete.connect(forget_user, sender=User, dispatch_uid='accounts_forget_user_delete')
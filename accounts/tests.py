@@ -1,3 +1,66 @@
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from attendance.models import Attendance, Event, Visitor
+from members.models import Member
+from ministries.models import Ministry
+from .models import User
+
+
+class RowScopeTests(TestCase):
+    def setUp(self):
+        self.leader = User.objects.create_user(username='leader', password='secret123', role=User.Role.MINISTRY_LEADER)
+        self.youth = Ministry.objects.create(name='Youth', leader=self.leader)
+        self.choir = Ministry.objects.create(name='Choir')
+        self.youth_member = Member.objects.create(full_name='Jane Doe', phone='0700000001', main_ministry=self.youth)
+        self.choir_member = Member.objects.create(full_name='John Doe', phone='0700000002', main_ministry=self.choir)
+        self.unassigned = Member.objects.create(full_name='Ann Doe', phone='0700000003')
+        self.event = Event.objects.create(name='Sunday Service', date=timezone.now())
+        for member in (self.youth_member, self.choir_member, self.unassigned):
+            Attendance.objects.create(member=member, event=self.event)
+        Visitor.objects.create(full_name='Guest', phone_number='0711000000', event=self.event)
+
+    def client_for(self, role, **flags):
+        user = User.objects.create_user(username=role.lower(), password='secret123', role=role, **flags)
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def member_ids(self, client):
+        return {row['id'] for row in client.get(reverse('member-list')).data['results']}
+
+    def test_full_access_roles_see_everyone(self):
+        everyone = {self.youth_member.pk, self.choir_member.pk, self.unassigned.pk}
+        for role in (User.Role.BISHOP, User.Role.ADMIN, User.Role.DATA_ENTRY):
+            self.assertEqual(self.member_ids(self.client_for(role)), everyone, role)
+        self.assertEqual(self.member_ids(self.client_for(User.Role.MEMBER, is_staff=True)), everyone)
+
+    def test_members_see_no_member_data(self):
+        client = self.client_for(User.Role.MEMBER)
+        self.assertEqual(self.member_ids(client), set())
+        self.assertEqual(client.get(reverse('attendance-list')).data['results'], [])
+        self.assertEqual(client.get(reverse('visitor-list')).data['results'], [])
+
+    def test_leaders_see_their_ministries(self):
+        client = APIClient()
+        client.force_authenticate(self.leader)
+        self.assertEqual(self.member_ids(client), {self.youth_member.pk})
+        attendance = client.get(reverse('attendance-list')).data['results']
+        self.assertEqual([row['member'] for row in attendance], [self.youth_member.pk])
+        self.assertEqual(client.get(reverse('visitor-list')).data['results'], [])
+        response = client.get(reverse('member-detail', args=[self.choir_member.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_leaders_only_write_their_ministries(self):
+        client = APIClient()
+        client.force_authenticate(self.leader)
+        url = reverse('member-detail', args=[self.youth_member.pk])
+        response = client.patch(url, {'main_ministry': self.choir.pk}, format='json')
+        self.assertEqual(response.status_code, 403)
+        response = client.post(reverse('attendance-toggle'), {'event': self.event.pk, 'member': self.choir_member.pk}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Attendance.objects.get(member=self.choir_member).status, 'PRESENT')
+        response = client.get(reverse('analytics-attendance-trends'))
+        self.assertEqual(response.status_code, 403)
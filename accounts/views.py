@@ -7,6 +7,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-date_joined', '-id')
 
     def get_queryset(self):
         user = self.request.user
@@ -0,0 +1,223 @@
+"""
+Leadership reports. Each one is a few GROUP BY queries whose small result
+sets (one row per week, month or cohort) are reshaped in Python, so the
+cost grows with the reporting window rather than with the number of
+attendance rows.
+"""
+import datetime
+from statistics import median
+
+from django.db.models import Count, Min, OuterRef, Q, Subquery
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from attendance.models import Attendance, Visitor
+from members.models import Member
+from ministries.models import Ministry
+from stats.counters import EPOCH
+from stats.models import StatCounter
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month_start(index):
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _rate(part, whole):
+    return round(part / whole, 3) if whole else None
+
+
+def _rolling_mean(values, window):
+    means, total = [], 0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        means.append(round(total / min(i + 1, window), 1))
+    return means
+
+
+def attendance_trends(events, window=4):
+    """
+    Week by week: services held, members present/absent and visitors for
+    `events`, in total and per service (by schedule slot, '' for events
+    not created from the schedule).
+    """
+    def empty():
+        return {'services': 0, 'present': 0, 'absent': 0, 'visitors': 0}
+
+    # {week: {slot: counts}}, each query grouped by week and slot
+    weeks = {}
+
+    def slot(week, name):
+        return weeks.setdefault(_as_date(week), {}).setdefault(name, empty())
+
+    for row in events.annotate(week=TruncWeek('date')).values('week', 'slot').annotate(n=Count('id')).order_by():
+        slot(row['week'], row['slot'])['services'] = row['n']
+    attendance = (
+        Attendance.objects.filter(event__in=events)
+        .annotate(week=TruncWeek('event__date')).values('week', 'event__slot')
+        .annotate(present=Count('id', filter=Q(status='PRESENT')), absent=Count('id', filter=Q(status='ABSENT')))
+        .order_by()
+    )
+    for row in attendance:
+        slot(row['week'], row['event__slot']).update(present=row['present'], absent=row['absent'])
+    visitors = (
+        Visitor.objects.filter(event__in=events)
+        .annotate(week=TruncWeek('event__date')).values('week', 'event__slot')
+        .annotate(n=Count('id')).order_by()
+    )
+    for row in visitors:
+        slot(row['week'], row['event__slot'])['visitors'] = row['n']
+    if not weeks:
+        return []
+
+    # Weeks without a service are reported as zeros so charts keep their scale
+    first, last = min(weeks), max(weeks)
+    series = []
+    for i in range((last - first).days // 7 + 1):
+        week = first + datetime.timedelta(weeks=i)
+        by_service = weeks.get(week, {})
+        totals = empty()
+        for counts in by_service.values():
+            for name in totals:
+                totals[name] += counts[name]
+            counts['present_per_service'] = round(counts['present'] / counts['services'], 1) if counts['services'] else None
+        series.append({'week': week, **totals, 'by_service': dict(sorted(by_service.items()))})
+    rolling = _rolling_mean([week['present'] for week in series], window)
+    for week, average in zip(series, rolling):
+        week['present_per_service'] = round(week['present'] / week['services'], 1) if week['services'] else None
+        week['present_rolling_average'] = average
+    return series
+
+
+def visitor_conversion(bounds):
+    """
+    Visitors (told apart by phone number) grouped by the month of their first
+    visit, with how many later registered as members and how quickly.
+
+    People who were already members when they first came as visitors are
+    left out; they were not converted.
+    """
+    joined = Member.objects.filter(phone_key=OuterRef('phone_key')).order_by('created_at').values('created_at')[:1]
+    people = (
+        Visitor.objects.exclude(phone_key='')
+        .values('phone_key')
+        .annotate(first_visit=Min('event__date'), visits=Count('id'))
+        .annotate(joined=Subquery(joined))
+        .filter(**{f'first_visit__{lookup}': value for lookup, value in bounds.items()})
+        .order_by()
+    )
+
+    months = {}
+    for person in people.values_list('first_visit', 'visits', 'joined'):
+        first_visit, visits, joined_at = person
+        if joined_at is not None and joined_at < first_visit:
+            continue
+        month = months.setdefault(_as_date(first_visit).replace(day=1), {'visitors': 0, 'returning': 0, 'converted': 0, 'days': []})
+        month['visitors'] += 1
+        month['returning'] += visits > 1
+        if joined_at is not None:
+            month['converted'] += 1
+            month['days'].append((joined_at - first_visit).days)
+
+    results = []
+    for month in sorted(months):
+        row = months[month]
+        days = row.pop('days')
+        results.append({
+            'month': month,
+            **row,
+            'conversion_rate': _rate(row['converted'], row['visitors']),
+            'median_days_to_convert': median(days) if days else None,
+        })
+    totals = {
+        'visitors': sum(row['visitors'] for row in results),
+        'converted': sum(row['converted'] for row in results),
+    }
+    totals['conversion_rate'] = _rate(totals['converted'], totals['visitors'])
+    return {'totals': totals, 'months': results}
+
+
+def retention_cohorts(bounds, horizon):
+    """
+    Members grouped by the month they joined; for each of the following
+    `horizon` months, the share of the cohort present at least once.
+    """
+    members = Member.objects.filter(**{f'joined_date__{lookup}': _as_date(value) for lookup, value in bounds.items()})
+    sizes = {
+        _as_date(row['cohort']): row['size']
+        for row in members.annotate(cohort=TruncMonth('joined_date')).values('cohort')
+        .annotate(size=Count('id')).order_by().exclude(cohort=None)
+    }
+    if not sizes:
+        return []
+
+    active = (
+        Attendance.objects.filter(status='PRESENT', member__in=members)
+        .annotate(cohort=TruncMonth('member__joined_date'), month=TruncMonth('event__date'))
+        .values('cohort', 'month')
+        .annotate(members=Count('member', distinct=True))
+        .order_by()
+    )
+    matrix = {cohort: [0] * (horizon + 1) for cohort in sizes}
+    for row in active:
+        cohort = _as_date(row['cohort'])
+        offset = _month_index(_as_date(row['month'])) - _month_index(cohort)
+        if cohort in matrix and 0 <= offset <= horizon:
+            matrix[cohort][offset] = row['members']
+
+    # Months that haven't happened yet are left out rather than shown as 0%
+    current = _month_index(timezone.localdate())
+    return [{
+        'cohort': cohort,
+        'size': sizes[cohort],
+        'retention': [
+            _rate(count, sizes[cohort])
+            for offset, count in enumerate(matrix[cohort])
+            if _month_index(cohort) + offset <= current
+        ],
+    } for cohort in sorted(sizes)]
+
+
+def ministry_growth(months):
+    """
+    Per ministry: members registered in each of the last `months` calendar
+    months and the ministry's size at the end of each, read from the
+    dashboard counters.
+    """
+    last = _month_index(timezone.localdate())
+    window = [_month_start(index) for index in range(last - months + 1, last + 1)]
+    counters = StatCounter.objects.filter(metric__startswith='members.ministry.').filter(
+        Q(period=StatCounter.PERIOD_ALL, bucket=EPOCH)
+        | Q(period=StatCounter.PERIOD_MONTH, bucket__gte=window[0])
+    ).values_list('metric', 'period', 'bucket', 'value')
+
+    totals, monthly = {}, {}
+    for metric, period, bucket, value in counters:
+        ministry_id = int(metric.rsplit('.', 1)[1])
+        if period == StatCounter.PERIOD_ALL:
+            totals[ministry_id] = value
+        else:
+            monthly.setdefault(ministry_id, {})[bucket] = value
+
+    results = []
+    for ministry_id, name in Ministry.objects.filter(pk__in=totals).values_list('id', 'name').order_by('name'):
+        new = [monthly.get(ministry_id, {}).get(month, 0) for month in window]
+        # Walk back from today's size, removing each month's registrations
+        size, sizes = totals[ministry_id], []
+        for count in reversed(new):
+            sizes.append(size)
+            size -= count
+        sizes.reverse()
+        results.append({'id': ministry_id, 'name': name, 'new_members': new, 'members': sizes})
+    return {'months': window, 'ministries': results}
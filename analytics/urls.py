@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import AttendanceTrendsView, MinistryGrowthView, RetentionCohortsView, VisitorConversionView
+
+urlpatterns = [
+    path('analytics/attendance-trends/', AttendanceTrendsView.as_view(), name='analytics-attendance-trends'),
+    path('analytics/visitor-conversion/', VisitorConversionView.as_view(), name='analytics-visitor-conversion'),
+    path('analytics/retention/', RetentionCohortsView.as_view(), name='analytics-retention'),
+    path('analytics/ministry-growth/', MinistryGrowthView.as_view(), name='analytics-ministry-growth'),
+]
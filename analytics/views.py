@@ -0,0 +1,103 @@
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from rest_framework import permissions, serializers, views
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from accounts.scoping import HasFullScope
+from attendance.models import Event
+from core.filters import DateRangeFilterBackend
+from . import reports
+
+
+class AnalyticsView(views.APIView):
+    """
+    Base for the report endpoints. Results are cached per report and query
+    string for ANALYTICS_CACHE_SECONDS, so reports can lag the data by that
+    much. They cover the whole church, so only full-scope roles may read them.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasFullScope]
+    report_name = None
+    # Window used when ?date_from is not given
+    default_days = 365
+
+    def get(self, request):
+        params = sorted(request.query_params.items())
+        key = f'analytics:{self.report_name}:' + hashlib.md5(repr(params).encode()).hexdigest()
+        data = cache.get(key)
+        if data is None:
+            data = self.compute(request)
+            cache.set(key, data, settings.ANALYTICS_CACHE_SECONDS)
+        response = Response(data)
+        patch_cache_control(response, private=True, max_age=settings.ANALYTICS_CACHE_SECONDS)
+        return response
+
+    def compute(self, request):
+        raise NotImplementedError
+
+    def get_bounds(self, request, is_datetime=True):
+        bounds = DateRangeFilterBackend().get_bounds(request, is_datetime)
+        if 'gte' not in bounds:
+            start = timezone.localdate() - datetime.timedelta(days=self.default_days)
+            if is_datetime:
+                start = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+            bounds['gte'] = start
+        return bounds
+
+    def get_int(self, request, name, default, maximum):
+        value = request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: ['A whole number is required.']})
+        if not 1 <= value <= maximum:
+            raise ValidationError({name: [f'Must be between 1 and {maximum}.']})
+        return value
+
+
+class AttendanceTrendsView(AnalyticsView):
+    """`?date_from&date_to&is_service=true&window=4`: weekly attendance, in total and per service."""
+    report_name = 'attendance-trends'
+
+    def compute(self, request):
+        events = Event.objects.filter(**{f'date__{lookup}': value for lookup, value in self.get_bounds(request).items()})
+        is_service = request.query_params.get('is_service')
+        if is_service not in (None, ''):
+            try:
+                events = events.filter(is_service=serializers.BooleanField().to_internal_value(is_service))
+            except ValidationError:
+                raise ValidationError({'is_service': ['Invalid value.']})
+        window = self.get_int(request, 'window', 4, 52)
+        return reports.attendance_trends(events, window=window)
+
+
+class VisitorConversionView(AnalyticsView):
+    """`?date_from&date_to`: visitors by month of first visit and how many became members."""
+    report_name = 'visitor-conversion'
+
+    def compute(self, request):
+        return reports.visitor_conversion(self.get_bounds(request))
+
+
+class RetentionCohortsView(AnalyticsView):
+    """`?date_from&date_to&months=12`: monthly joined_date cohorts and their attendance."""
+    report_name = 'retention'
+
+    def compute(self, request):
+        horizon = self.get_int(request, 'months', 12, 60)
+        return reports.retention_cohorts(self.get_bounds(request, is_datetime=False), horizon)
+
+
+class MinistryGrowthView(AnalyticsView):
+    """`?months=12`: new members and size per ministry for each calendar month."""
+    report_name = 'ministry-growth'
+
+    def compute(self, request):
+        return reports.ministry_growth(self.get_int(request, 'months', 12, 60))
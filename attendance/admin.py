@@ -1,13 +1,23 @@
 from django.contrib import admin
-from .models import Event, Attendance
+from .models import Event, Attendance, RecurringEvent, VisitorProfile
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ('name', 'date', 'is_service')
+    list_display = ('name', 'date', 'is_service', 'slot')
     list_filter = ('is_service', 'date')
 
+@admin.register(RecurringEvent)
+class RecurringEventAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slot', 'weekday', 'start_time', 'is_service', 'active')
+    list_filter = ('weekday', 'is_service', 'active')
+
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ('member', 'event', 'status')
     list_filter = ('event', 'status')
     search_fields = ('member__full_name', 'event__name')
+
+@admin.register(VisitorProfile)
+class VisitorProfileAdmin(admin.ModelAdmin):
+    list_display = ('full_name', 'phone_number', 'visit_count', 'first_seen', 'last_seen', 'member')
+    search_fields = ('full_name', 'phone_key')
@@ -0,0 +1,179 @@
+"""
+In-memory member lookup for the check-in desk.
+
+Members are kept in two sorted lists of (key, member pk): `words` holds
+name tokens and lower-cased member ids, `digits` holds phone numbers and
+member id digits reversed, so "last digits" queries are prefix queries
+too. A prefix is found with two bisects, so lookups stay in the
+microseconds whatever the number of members.
+
+The index is built on first use and shared by every request of the
+process. At most every REFRESH_SECONDS, a lookup first applies members
+changed since the last refresh (by (updated_at, id), as in delta sync)
+and deletions (from the sync tombstones). The watermark trails now by SYNC_SAFETY_WINDOW_SECONDS
+so rows from transactions that commit late are still picked up.
+"""
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from core.utils import name_tokens, normalize_phone
+from members.models import Member
+from sync.models import Tombstone
+
+REFRESH_SECONDS = 1
+# Past this many changes a rebuild is cheaper than patching the lists
+REBUILD_THRESHOLD = 5000
+MIN_DIGITS = 3
+FIELDS = ('id', 'member_id', 'full_name', 'phone', 'main_ministry_id', 'updated_at')
+NON_DIGITS = re.compile(r'\D')
+HAS_LETTER = re.compile(r'[^\W\d_]')
+
+
+def _terms(query):
+    """Split a query into ('digits', reversed digits) and ('words', prefix) terms."""
+    terms = []
+    for raw in query.lower().split():
+        if not HAS_LETTER.search(raw):
+            digits = NON_DIGITS.sub('', raw)
+            if len(digits) >= MIN_DIGITS:
+                terms.append(('digits', digits[::-1]))
+        elif any(ch.isdigit() for ch in raw):
+            # Looks like a member id, e.g. CMS2026
+            terms.append(('words', raw))
+        else:
+            terms.extend(('words', token) for token in name_tokens(raw))
+    return terms
+
+
+class MemberLookup:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.checked_at = 0
+
+    def _keys(self, member_id, full_name, phone):
+        words = set(name_tokens(full_name))
+        digits = set()
+        if member_id:
+            words.add(member_id.lower())
+            number = NON_DIGITS.sub('', member_id)
+            if number:
+                digits.add(number[::-1])
+        phone = normalize_phone(phone)
+        if phone:
+            digits.add(phone[::-1])
+        return words, digits
+
+    def _add(self, pk, member_id, full_name, phone, ministry_id):
+        words, digits = self._keys(member_id, full_name, phone)
+        for key in words:
+            insort(self.words, (key, pk))
+        for key in digits:
+            insort(self.digits, (key, pk))
+        self.members[pk] = (member_id, full_name, phone, ministry_id, words, digits)
+
+    def _remove(self, pk):
+        member = self.members.pop(pk, None)
+        if member is None:
+            return
+        for entries, keys in ((self.words, member[4]), (self.digits, member[5])):
+            for key in keys:
+                i = bisect_left(entries, (key, pk))
+                if i < len(entries) and entries[i] == (key, pk):
+                    del entries[i]
+
+    def _horizon(self):
+        return timezone.now() - timedelta(seconds=settings.SYNC_SAFETY_WINDOW_SECONDS)
+
+    def _rebuild(self):
+        # Read the watermarks first: anything changing during the load is re-read
+        tombstone_id = Tombstone.objects.aggregate(last=Max('id'))['last'] or 0
+        horizon = self._horizon()
+        members, words, digits = {}, [], []
+        for pk, member_id, full_name, phone, ministry_id, _ in Member.objects.values_list(*FIELDS).iterator(chunk_size=2000):
+            row_words, row_digits = self._keys(member_id, full_name, phone)
+            words.extend((key, pk) for key in row_words)
+            digits.extend((key, pk) for key in row_digits)
+            members[pk] = (member_id, full_name, phone, ministry_id, row_words, row_digits)
+        words.sort()
+        digits.sort()
+        self.members, self.words, self.digits = members, words, digits
+        self.updated_at, self.last_id, self.tombstone_id = horizon, 0, tombstone_id
+        self.loaded = True
+
+    def _refresh(self):
+        horizon = self._horizon()
+        changed = list(
+            Member.objects.filter(Q(updated_at__gt=self.updated_at) | Q(updated_at=self.updated_at, id__gt=self.last_id))
+            .order_by('updated_at', 'id').values_list(*FIELDS)[:REBUILD_THRESHOLD + 1]
+        )
+        deleted = list(
+            Tombstone.objects.filter(model=Member._meta.label_lower, id__gt=self.tombstone_id, ministry_id=None)
+            .order_by('id').values_list('id', 'object_id')[:REBUILD_THRESHOLD + 1]
+        )
+        if len(changed) > REBUILD_THRESHOLD or len(deleted) > REBUILD_THRESHOLD:
+            self._rebuild()
+            return
+        for pk, member_id, full_name, phone, ministry_id, _ in changed:
+            current = self.members.get(pk)
+            if current is None or current[:4] != (member_id, full_name, phone, ministry_id):
+                self._remove(pk)
+                self._add(pk, member_id, full_name, phone, ministry_id)
+        for tombstone_id, object_id in deleted:
+            self._remove(object_id)
+            self.tombstone_id = tombstone_id
+        if changed:
+            key = (changed[-1][5], changed[-1][0])
+            if key[0] > horizon:
+                # Still inside the safety window: read those rows again next time
+                key = (horizon, 0)
+            self.updated_at, self.last_id = max((self.updated_at, self.last_id), key)
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self.loaded and now - self.checked_at < REFRESH_SECONDS:
+            return
+        if self.loaded:
+            self._refresh()
+        else:
+            self._rebuild()
+        self.checked_at = now
+
+    def _range(self, kind, prefix):
+        entries = self.digits if kind == 'digits' else self.words
+        return entries, bisect_left(entries, (prefix,)), bisect_left(entries, (prefix + '\uffff',))
+
+    def lookup(self, query, limit=20, ministry_ids=None):
+        """
+        Members matching every term of `query`, as (pk, member_id, full_name,
+        phone) sorted by name; only members of `ministry_ids` when given.
+        """
+        terms = _terms(query)
+        if not terms:
+            return []
+        with self.lock:
+            self._ensure_fresh()
+            # Intersect from the rarest term up, stopping as soon as nothing is left
+            ranges = sorted((self._range(kind, prefix) for kind, prefix in terms), key=lambda found: found[2] - found[1])
+            matches = None
+            for entries, lo, hi in ranges:
+                found = {pk for _, pk in entries[lo:hi]}
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return []
+            if ministry_ids is not None:
+                ministry_ids = set(ministry_ids)
+                matches = [pk for pk in matches if self.members[pk][3] in ministry_ids]
+            rows = [(pk, *self.members[pk][:3]) for pk in matches]
+        return heapq.nsmallest(limit, rows, key=lambda row: (row[2].lower(), row[0]))
+
+
+member_lookup = MemberLookup()
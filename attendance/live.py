@@ -0,0 +1,127 @@
+"""
+Per-event live updates for check-in devices.
+
+Writers call `publish()` (from sync code, after commit). Changes to the same
+record within LIVE_COALESCE_SECONDS are merged, and each burst goes out to
+every subscriber of the event as one message with fresh counts, so the
+counts are queried once per burst, not once per device or per tap.
+
+InProcessBroker only reaches subscribers in the same process. Deployments
+running several workers should point LIVE_BROKER at a class with the same
+`subscribe`/`publish` interface backed by a shared broker.
+"""
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import Event
+
+QUEUE_SIZE = 100
+
+
+def event_counts(event_id, ministry_ids=None):
+    return (
+        Event.objects.with_counts(ministry_ids).filter(pk=event_id)
+        .values('present_count', 'absent_count', 'visitor_count').first()
+    )
+
+
+class Subscription:
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, message):
+        if self.queue.full():
+            # A client this far behind can't catch up change by change
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = {'resync': True, 'counts': message.get('counts')}
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.channel.unsubscribe(self)
+
+
+class Channel:
+    def __init__(self, broker, event_id, loop):
+        self.broker = broker
+        self.event_id = event_id
+        self.loop = loop
+        self.subscribers = set()
+        self.pending = {}
+        self.flush_scheduled = False
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+        if not self.subscribers:
+            self.broker.drop(self)
+
+    def push(self, changes):
+        # Runs on the channel's event loop
+        for key, change in changes:
+            self.pending[key] = change
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_later(settings.LIVE_COALESCE_SECONDS, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self):
+        changes, self.pending = list(self.pending.values()), {}
+        self.flush_scheduled = False
+        message = {'changes': changes, 'counts': await sync_to_async(event_counts)(self.event_id)}
+        for subscription in list(self.subscribers):
+            subscription.deliver(message)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, event_id):
+        """Called on the event loop serving the stream."""
+        with self.lock:
+            channel = self.channels.get(event_id)
+            if channel is None:
+                channel = self.channels[event_id] = Channel(self, event_id, asyncio.get_running_loop())
+            subscription = Subscription(channel)
+            channel.subscribers.add(subscription)
+        return subscription
+
+    def drop(self, channel):
+        with self.lock:
+            if not channel.subscribers and self.channels.get(channel.event_id) is channel:
+                del self.channels[channel.event_id]
+
+    def publish(self, event_id, changes):
+        """`changes` is a list of (key, change); later changes replace pending ones with the same key."""
+        with self.lock:
+            channel = self.channels.get(event_id)
+        if channel is not None and changes:
+            channel.loop.call_soon_threadsafe(channel.push, list(changes))
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.LIVE_BROKER)()
+    return _broker
+
+
+def attendance_change(attendance):
+    return ('attendance', attendance.member_id), {
+        'type': 'attendance', 'member': attendance.member_id, 'status': attendance.status,
+    }
+
+
+def publish(event_id, changes):
+    get_broker().publish(event_id, changes)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from attendance.models import VisitorProfile
+from attendance.visitors import refresh_profiles
+
+
+class Command(BaseCommand):
+    help = 'Recompute visitor profiles from the visitor records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Only build profiles when there are none yet (safe to run on every deploy)',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and VisitorProfile.objects.exists():
+            return
+        refresh_profiles()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {VisitorProfile.objects.count()} visitor profiles"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from attendance.rollup import compact, rollup
+
+
+class Command(BaseCommand):
+    help = 'Fold older services into the yearly attendance bitsets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compact', action='store_true',
+            help='Also delete raw attendance older than ATTENDANCE_RAW_RETENTION_DAYS once rolled up',
+        )
+
+    def handle(self, *args, **options):
+        message = f"Rolled up {rollup()} services"
+        if options['compact']:
+            message += f", compacted {compact()} attendance records"
+        self.stdout.write(self.style.SUCCESS(message))
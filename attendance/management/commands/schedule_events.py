@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from attendance.schedule import materialize
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming events from the active recurring event definitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SCHEDULE_DAYS_AHEAD)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        created = materialize(today, today + timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {created} events"))
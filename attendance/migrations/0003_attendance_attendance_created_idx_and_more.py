@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_visitor'),
+        ('members', '0004_child_child_created_idx_member_member_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['created_at', 'id'], name='attendance_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_at', 'id'], name='event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['created_at', 'id'], name='visitor_created_idx'),
+        ),
+    ]
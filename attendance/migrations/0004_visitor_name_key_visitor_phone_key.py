@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:59
+
+from django.db import migrations, models
+
+from core.utils import name_key, normalize_phone
+
+
+def fill_dedup_keys(apps, schema_editor):
+    Visitor = apps.get_model('attendance', 'Visitor')
+    batch = []
+    for obj in Visitor.objects.only('id', 'full_name', 'phone_number').iterator(chunk_size=2000):
+        obj.phone_key = normalize_phone(obj.phone_number)
+        obj.name_key = name_key(obj.full_name)
+        batch.append(obj)
+        if len(batch) >= 2000:
+            Visitor.objects.bulk_update(batch, ['phone_key', 'name_key'])
+            batch = []
+    Visitor.objects.bulk_update(batch, ['phone_key', 'name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_attendance_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitor',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='phone_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_dedup_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_visitor_name_key_visitor_phone_key'),
+        ('members', '0008_child_child_updated_idx_member_member_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_at', 'id'], name='event_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['updated_at', 'id'], name='visitor_updated_idx'),
+        ),
+    ]
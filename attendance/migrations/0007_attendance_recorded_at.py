@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_event_date_service_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='recorded_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
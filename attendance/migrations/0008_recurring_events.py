@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:14
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_service_dates(apps, schema_editor):
+    # The first service of each day becomes that day's ad hoc service slot
+    Event = apps.get_model('attendance', 'Event')
+    days = set()
+    to_update = []
+    for event in Event.objects.filter(is_service=True).only('id', 'date').order_by('date', 'id').iterator():
+        day = timezone.localdate(event.date)
+        if day not in days:
+            days.add(day)
+            event.service_date = day
+            event.slot = 'service'
+            to_update.append(event)
+    Event.objects.bulk_update(to_update, ['service_date', 'slot'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_attendance_recorded_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('slot', models.SlugField(unique=True)),
+                ('weekday', models.IntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('is_service', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='service_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='slot',
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill_service_dates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('service_date', 'slot'), name='event_service_slot_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringevent',
+            index=models.Index(fields=['created_at', 'id'], name='recurringevent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringevent',
+            index=models.Index(fields=['updated_at', 'id'], name='recurringevent_updated_idx'),
+        ),
+    ]
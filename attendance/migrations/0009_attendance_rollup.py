@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0008_recurring_events'),
+        ('members', '0008_child_child_updated_idx_member_member_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='ordinal',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='AttendanceYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('present', models.BinaryField(default=b'')),
+                ('recorded', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_years', to='members.member')),
+            ],
+            options={
+                'unique_together': {('member', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0009_attendance_rollup'),
+        ('members', '0008_child_child_updated_idx_member_member_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitor',
+            name='member',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='visits', to='members.member'),
+        ),
+        migrations.CreateModel(
+            name='VisitorProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('phone_key', models.CharField(max_length=20, unique=True)),
+                ('full_name', models.CharField(max_length=255)),
+                ('phone_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('residence', models.CharField(blank=True, max_length=255, null=True)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('visit_count', models.PositiveIntegerField(default=0)),
+                ('converted_at', models.DateTimeField(blank=True, null=True)),
+                ('member', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='visitor_profiles', to='members.member')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['created_at', 'id'], name='visitorprofile_created_idx'), models.Index(fields=['updated_at', 'id'], name='visitorprofile_updated_idx'), models.Index(fields=['last_seen', 'id'], name='visitorprofile_seen_idx')],
+            },
+        ),
+    ]
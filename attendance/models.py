@@ -1,12 +1,83 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from core.models import TimeStampedModel
+from core.utils import name_key, normalize_phone
 from members.models import Member
 
+class EventQuerySet(models.QuerySet):
+    def with_counts(self, ministry_ids=None):
+        """Attendance and visitor counts; with `ministry_ids`, only those ministries' members are counted."""
+        present, absent = Q(attendances__status='PRESENT'), Q(attendances__status='ABSENT')
+        if ministry_ids is not None:
+            roster = Q(attendances__member__main_ministry_id__in=ministry_ids)
+            present, absent = present & roster, absent & roster
+        # Visitors are counted in a subquery: joining them alongside the
+        # attendances would multiply the rows being counted
+        visitors = (
+            Visitor.objects.filter(event=OuterRef('pk')).order_by()
+            .values('event').annotate(n=Count('id')).values('n')
+        )
+        return self.annotate(
+            present_count=Count('attendances', filter=present),
+            absent_count=Count('attendances', filter=absent),
+            visitor_count=Coalesce(Subquery(visitors), 0),
+        )
+
+    def touch(self):
+        """Bump updated_at after attendance changed the counts, so delta sync resends the events."""
+        return self.update(updated_at=timezone.now())
+
+
+class RecurringEvent(TimeStampedModel):
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    name = models.CharField(max_length=255) # e.g. Sunday First Service
+    # Identifies this occurrence among a day's events, e.g. 'sunday-1'
+    slot = models.SlugField(max_length=50, unique=True)
+    weekday = models.IntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    is_service = models.BooleanField(default=True)
+    description = models.TextField(blank=True, null=True)
+    active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_weekday_display()} {self.start_time:%H:%M})"
+
+
 class Event(TimeStampedModel):
+    # Slot of services started from the check-in screen without a schedule
+    DEFAULT_SLOT = 'service'
+
     name = models.CharField(max_length=255)
     date = models.DateTimeField()
     description = models.TextField(blank=True, null=True)
     is_service = models.BooleanField(default=True) # e.g. Sunday Service
+    # Set on scheduled services; (service_date, slot) names one occurrence
+    service_date = models.DateField(blank=True, null=True, editable=False)
+    slot = models.CharField(max_length=50, blank=True, editable=False)
+    # Bit position in the year's AttendanceYear bitsets, once rolled up
+    ordinal = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = TimeStampedModel.Meta.indexes + [
+            models.Index(fields=['date', 'is_service'], name='event_date_service_idx'),
+        ]
+        constraints = [
+            # Also the index today's services are looked up by
+            models.UniqueConstraint(fields=['service_date', 'slot'], name='event_service_slot_unique'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.date.strftime('%Y-%m-%d')}"
@@ -15,18 +86,81 @@ class Attendance(TimeStampedModel):
     member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='attendances')
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='attendances')
     status = models.CharField(max_length=20, default='PRESENT') # Present, Absent, Excused
+    # When the status was decided: now for online writes, the device's clock
+    # for offline check-ins synced later. Later wins when they conflict.
+    recorded_at = models.DateTimeField(blank=True, null=True, editable=False)
 
-    class Meta:
+    class Meta(TimeStampedModel.Meta):
         unique_together = ('member', 'event')
 
+    def save(self, *args, **kwargs):
+        self.recorded_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'recorded_at'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.member} - {self.event}"
 
+class AttendanceYear(models.Model):
+    """
+    A member's attendance at one year's rolled-up services, as bitsets:
+    bit n stands for the service with Event.ordinal n in that year.
+    """
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='attendance_years')
+    year = models.PositiveSmallIntegerField()
+    present = models.BinaryField(default=b'')
+    # Any status recorded, so absent = recorded and not present
+    recorded = models.BinaryField(default=b'')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('member', 'year')
+
+    def __str__(self):
+        return f"{self.member} - {self.year}"
+
 class Visitor(TimeStampedModel):
     full_name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     residence = models.CharField(max_length=255, blank=True, null=True)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='visitors')
+    # Set when the visitor registers as a member
+    member = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, blank=True, related_name='visits')
+
+    # Normalized blocking keys for duplicate detection
+    phone_key = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+    name_key = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.phone_key = normalize_phone(self.phone_number)
+        self.name_key = name_key(self.full_name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.full_name} (Visitor at {self.event.name})"
+
+class VisitorProfile(TimeStampedModel):
+    """
+    One person's visits, told apart by phone number: kept up to date from
+    their Visitor rows by attendance.visitors.refresh_profiles.
+    """
+    phone_key = models.CharField(max_length=20, unique=True)
+    # From the latest visit
+    full_name = models.CharField(max_length=255)
+    phone_number = models.CharField(max_length=20, blank=True, null=True)
+    residence = models.CharField(max_length=255, blank=True, null=True)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    visit_count = models.PositiveIntegerField(default=0)
+    member = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, blank=True, related_name='visitor_profiles')
+    converted_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = TimeStampedModel.Meta.indexes + [
+            models.Index(fields=['last_seen', 'id'], name='visitorprofile_seen_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.full_name} ({self.visit_count} visits)"
@@ -0,0 +1,263 @@
+"""
+Yearly attendance bitsets.
+
+Services older than ATTENDANCE_ROLLUP_AFTER_DAYS are rolled up: each gets
+an ordinal within its year (Event.ordinal) and every member's attendance
+at them is folded into one AttendanceYear row per year, bit n standing for
+ordinal n. Ordinals are handed out in date order and never reused, so a
+service added to a rolled-up year later just takes the next free bit.
+
+Later writes to rolled-up services are applied to the bitsets as they
+happen (`apply_changes`), so once a year is rolled up its raw Attendance
+rows can be compacted away, bar each member's first and last present
+service. Services not rolled up yet are read from the
+raw table, which stays the source of truth for recent events.
+
+Histories are plain Python ints: rates are popcounts of shifted masks and
+streaks come from shift-and-mask loops, whatever the number of services.
+"""
+import datetime
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Attendance, AttendanceYear, Event
+
+_state = threading.local()
+
+
+def _bits(value):
+    return int.from_bytes(value or b'', 'little')
+
+
+def _bytes(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def _year(date):
+    return timezone.localtime(date).year
+
+
+def _year_start(year):
+    return timezone.make_aware(datetime.datetime(year, 1, 1))
+
+
+@contextmanager
+def compacting():
+    """Deletes inside this block archive raw rows instead of clearing bits."""
+    _state.compacting = True
+    try:
+        yield
+    finally:
+        _state.compacting = False
+
+
+def is_compacting():
+    return getattr(_state, 'compacting', False)
+
+
+def _write(marks):
+    """Apply {(member_id, year): [(ordinal, status or None), ...]} to the bitsets."""
+    if not marks:
+        return
+    with transaction.atomic():
+        AttendanceYear.objects.bulk_create(
+            [AttendanceYear(member_id=member, year=year) for member, year in marks],
+            batch_size=1000, ignore_conflicts=True,
+        )
+        rows = AttendanceYear.objects.select_for_update().filter(
+            member_id__in={member for member, _ in marks}, year__in={year for _, year in marks},
+        )
+        to_update = []
+        for row in rows:
+            changes = marks.get((row.member_id, row.year))
+            if changes is None:
+                continue
+            present, recorded = _bits(row.present), _bits(row.recorded)
+            for ordinal, status in changes:
+                bit = 1 << ordinal
+                present = present | bit if status == 'PRESENT' else present & ~bit
+                recorded = recorded | bit if status else recorded & ~bit
+            row.present, row.recorded = _bytes(present), _bytes(recorded)
+            to_update.append(row)
+        AttendanceYear.objects.bulk_update(to_update, ['present', 'recorded', 'updated_at'], batch_size=1000)
+
+
+def apply_changes(changes):
+    """
+    Reflect attendance writes in the bitsets of services already rolled up.
+    `changes` holds (member_id, event_id, status), status None for a deletion.
+    """
+    if is_compacting() or not changes:
+        return
+    events = {
+        pk: (_year(date), ordinal)
+        for pk, date, ordinal in Event.objects.filter(
+            pk__in={event for _, event, _ in changes}, ordinal__isnull=False,
+        ).values_list('pk', 'date', 'ordinal')
+    }
+    marks = {}
+    for member, event, status in changes:
+        if event in events:
+            year, ordinal = events[event]
+            marks.setdefault((member, year), []).append((ordinal, status))
+    _write(marks)
+
+
+@transaction.atomic
+def merge(primary_id, duplicate_id):
+    """Fold a duplicate member's bitsets into the primary's: present if either was."""
+    duplicate = {
+        row.year: (_bits(row.present), _bits(row.recorded))
+        for row in AttendanceYear.objects.filter(member_id=duplicate_id)
+    }
+    if not duplicate:
+        return
+    AttendanceYear.objects.bulk_create(
+        [AttendanceYear(member_id=primary_id, year=year) for year in duplicate], ignore_conflicts=True,
+    )
+    rows = list(AttendanceYear.objects.select_for_update().filter(member_id=primary_id, year__in=list(duplicate)))
+    for row in rows:
+        present, recorded = duplicate[row.year]
+        row.present = _bytes(_bits(row.present) | present)
+        row.recorded = _bytes(_bits(row.recorded) | recorded)
+    AttendanceYear.objects.bulk_update(rows, ['present', 'recorded', 'updated_at'])
+
+
+@transaction.atomic
+def rollup(now=None):
+    """Roll up services older than ATTENDANCE_ROLLUP_AFTER_DAYS; returns how many."""
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(days=settings.ATTENDANCE_ROLLUP_AFTER_DAYS)
+    pending = list(
+        Event.objects.select_for_update()
+        .filter(is_service=True, ordinal__isnull=True, date__lt=cutoff)
+        .order_by('date', 'id')
+    )
+    for year, events in groupby(pending, key=lambda event: _year(event.date)):
+        last = Event.objects.filter(
+            ordinal__isnull=False, date__gte=_year_start(year), date__lt=_year_start(year + 1),
+        ).aggregate(last=Max('ordinal'))['last']
+        start = 0 if last is None else last + 1
+        for ordinal, event in enumerate(events, start):
+            event.ordinal = ordinal
+    Event.objects.bulk_update(pending, ['ordinal'], batch_size=1000)
+
+    positions = {event.pk: (_year(event.date), event.ordinal) for event in pending}
+    marks = {}
+    rows = Attendance.objects.filter(event__in=pending).values_list('member_id', 'event_id', 'status')
+    for member, event, status in rows.iterator(chunk_size=5000):
+        year, ordinal = positions[event]
+        marks.setdefault((member, year), []).append((ordinal, status))
+    _write(marks)
+    return len(pending)
+
+
+def compact(now=None):
+    """
+    Delete raw attendance at rolled-up services older than
+    ATTENDANCE_RAW_RETENTION_DAYS, except each member's first and last
+    present service, which the follow-up engine reads from the raw table.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(days=settings.ATTENDANCE_RAW_RETENTION_DAYS)
+    present = Attendance.objects.filter(member=OuterRef('member'), status='PRESENT', event__is_service=True)
+    first = present.order_by('event__date', 'pk').values('pk')[:1]
+    last = present.order_by('-event__date', '-pk').values('pk')[:1]
+    with compacting(), transaction.atomic():
+        deleted, _ = (
+            Attendance.objects.filter(event__ordinal__isnull=False, event__date__lt=cutoff)
+            .exclude(pk=Subquery(first)).exclude(pk=Subquery(last))
+            .delete()
+        )
+    return deleted
+
+
+def history(member_id, now=None):
+    """
+    The member's (present, recorded) bits over every service up to now,
+    bit n for the nth service in date order, with the services' dates.
+    """
+    now = now or timezone.now()
+    services = list(
+        Event.objects.filter(is_service=True, date__lte=now)
+        .order_by('date', 'id').values_list('pk', 'date', 'ordinal')
+    )
+    rolled = {
+        row.year: (_bits(row.present), _bits(row.recorded))
+        for row in AttendanceYear.objects.filter(member_id=member_id)
+    }
+    recent = dict(
+        Attendance.objects.filter(
+            member_id=member_id, event__is_service=True, event__ordinal__isnull=True, event__date__lte=now,
+        ).values_list('event_id', 'status')
+    )
+    present = recorded = position = 0
+    for year, group in groupby(services, key=lambda service: _year(service[1])):
+        group = list(group)
+        year_present, year_recorded = rolled.get(year, (0, 0))
+        # Usually the year's rolled-up services come first and in ordinal
+        # order, so their bits move over in one shift
+        count = 0
+        while count < len(group) and group[count][2] == count:
+            count += 1
+        mask = (1 << count) - 1
+        present |= (year_present & mask) << position
+        recorded |= (year_recorded & mask) << position
+        for n, (pk, _, ordinal) in enumerate(group[count:], position + count):
+            if ordinal is None:
+                status = recent.get(pk)
+                present |= (status == 'PRESENT') << n
+                recorded |= (status is not None) << n
+            else:
+                present |= (year_present >> ordinal & 1) << n
+                recorded |= (year_recorded >> ordinal & 1) << n
+        position += len(group)
+    return present, recorded, [date for _, date, _ in services]
+
+
+def longest_run(bits):
+    run = 0
+    while bits:
+        bits &= bits >> 1
+        run += 1
+    return run
+
+
+def summary(member_id, services=52, years=3, now=None):
+    """Attendance rate over the last `services` services, streaks and a per-service heatmap of the last `years` years."""
+    now = now or timezone.now()
+    present, recorded, dates = history(member_id, now)
+    total = len(dates)
+    everything = (1 << total) - 1
+    # Services before the member's first recorded attendance don't count against them
+    first = (recorded & -recorded).bit_length() - 1 if recorded else total
+    start = max(total - services, first)
+    window = present >> start
+    last_attended = dates[present.bit_length() - 1] if present else None
+    since = _year(now) - years + 1
+    heatmap = []
+    for year, group in groupby(enumerate(dates), key=lambda item: _year(item[1])):
+        if year < since:
+            continue
+        heatmap.append({'year': year, 'services': [
+            {
+                'date': timezone.localdate(date),
+                'attended': bool(present >> n & 1) if recorded >> n & 1 else None,
+            }
+            for n, date in group
+        ]})
+    return {
+        'services': total - start,
+        'attended': window.bit_count(),
+        'rate': round(window.bit_count() * 100 / (total - start), 1) if total > start else None,
+        'current_streak': total - (~present & everything).bit_length(),
+        'longest_streak': longest_run(present),
+        'last_attended': last_attended,
+        'heatmap': heatmap,
+    }
@@ -0,0 +1,146 @@
+"""
+Recurring events and today's check-in event.
+
+Active RecurringEvent definitions are materialized into Event rows ahead of
+time, keyed by (service_date, slot). The key is unique, so materializing is
+a bulk insert that skips rows already there, and any number of workers can
+run it at once without creating duplicates. Check-in reads today's events
+with one query on the same key.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Event, RecurringEvent
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def occurrence(definition, day):
+    return Event(
+        name=definition.name,
+        date=timezone.make_aware(datetime.datetime.combine(day, definition.start_time)),
+        description=definition.description,
+        is_service=definition.is_service,
+        service_date=day,
+        slot=definition.slot,
+    )
+
+
+def materialize(start, end, definitions=None):
+    """Create the missing occurrences between `start` and `end` (dates, inclusive); returns how many."""
+    if definitions is None:
+        definitions = RecurringEvent.objects.filter(active=True)
+    by_weekday = {}
+    for definition in definitions:
+        by_weekday.setdefault(definition.weekday, []).append(definition)
+    if not by_weekday:
+        return 0
+    existing = set(
+        Event.objects.filter(service_date__range=(start, end))
+        .values_list('service_date', 'slot')
+    )
+    to_create = [
+        occurrence(definition, day)
+        for day in _days(start, end)
+        for definition in by_weekday.get(day.weekday(), ())
+        if (day, definition.slot) not in existing
+    ]
+    # Rows another worker inserted since the read above are skipped
+    Event.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+    return len(to_create)
+
+
+def reschedule(definition, slot=None):
+    """
+    Replace upcoming occurrences of `definition` (previously under `slot`)
+    that nobody has checked in to yet, after it was edited or deactivated.
+    """
+    now = timezone.now()
+    (
+        Event.objects.filter(slot=slot or definition.slot, date__gt=now, service_date__isnull=False)
+        .filter(attendances__isnull=True, visitors__isnull=True)
+        .delete()
+    )
+    if definition.active:
+        today = timezone.localdate(now)
+        materialize(today, today + datetime.timedelta(days=settings.SCHEDULE_DAYS_AHEAD), [definition])
+
+
+def is_one_off(event):
+    return event.service_date is None or event.slot == Event.DEFAULT_SLOT or event.slot.startswith('event-')
+
+
+def assign_slot(event):
+    """
+    File an event created directly (not from a definition) under its day so
+    check-in finds it: the day's first service takes Event.DEFAULT_SLOT,
+    anything else a slot of its own.
+    """
+    day = timezone.localdate(event.date)
+    own = f'event-{event.pk}'
+    slot = own
+    if event.is_service and not Event.objects.filter(service_date=day, slot=Event.DEFAULT_SLOT).exclude(pk=event.pk).exists():
+        slot = Event.DEFAULT_SLOT
+    try:
+        with transaction.atomic():
+            Event.objects.filter(pk=event.pk).update(service_date=day, slot=slot)
+    except IntegrityError:
+        # Another service took the default slot in the meantime
+        slot = own
+        Event.objects.filter(pk=event.pk).update(service_date=day, slot=slot)
+    event.service_date, event.slot = day, slot
+
+
+def todays_events(now=None, ministry_ids=None):
+    """
+    Today's scheduled events, in start order. When the schedule has nothing
+    for today (or it was never materialized), today's occurrences are created
+    first, falling back to events created for today without a slot and then
+    to an ad hoc service under Event.DEFAULT_SLOT.
+    Counts are limited to `ministry_ids` as in Event.objects.with_counts.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    events = Event.objects.with_counts(ministry_ids).filter(service_date=today).order_by('date', 'id')
+    found = list(events)
+    if found:
+        return found
+    start = timezone.make_aware(datetime.datetime.combine(today, datetime.time.min))
+    unfiled = Event.objects.filter(service_date__isnull=True, date__gte=start, date__lt=start + datetime.timedelta(days=1))
+    unfiled = list(unfiled.order_by('-is_service', 'date', 'id'))
+    for event in unfiled:
+        assign_slot(event)
+    if unfiled:
+        return list(events.all())
+    definitions = list(RecurringEvent.objects.filter(active=True, weekday=today.weekday()))
+    if definitions:
+        materialize(today, today, definitions)
+    else:
+        name = 'Sunday Service' if today.weekday() == 6 else 'Service'
+        Event.objects.bulk_create([Event(
+            name=f"{name} - {now.strftime('%d %b %Y')}",
+            date=now,
+            is_service=True,
+            service_date=today,
+            slot=Event.DEFAULT_SLOT,
+        )], ignore_conflicts=True)
+    return list(events.all())
+
+
+def current_event(events, now=None):
+    """The service in progress: the latest one already open for check-in, else the next one."""
+    now = now or timezone.now()
+    opens_before = datetime.timedelta(minutes=settings.SCHEDULE_CHECKIN_OPEN_MINUTES)
+    candidates = [event for event in events if event.is_service] or events
+    if not candidates:
+        return None
+    started = [event for event in candidates if event.date - opens_before <= now]
+    return started[-1] if started else candidates[0]
@@ -1,22 +1,88 @@
 from rest_framework import serializers
-from .models import Attendance, Event, Visitor
+from members.models import Member
+from .models import Attendance, Event, RecurringEvent, Visitor, VisitorProfile
+
+ATTENDANCE_STATUSES = ('PRESENT', 'ABSENT', 'EXCUSED')
 
 class EventSerializer(serializers.ModelSerializer):
+    # Read from Event.objects.with_counts() annotations when present
     attendance_count = serializers.SerializerMethodField()
+    absent_count = serializers.SerializerMethodField()
+    visitor_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
         fields = '__all__'
 
+    def _count(self, obj, annotation, queryset):
+        value = getattr(obj, annotation, None)
+        return queryset.count() if value is None else value
+
     def get_attendance_count(self, obj):
-        return obj.attendances.filter(status='PRESENT').count()
+        return self._count(obj, 'present_count', obj.attendances.filter(status='PRESENT'))
+
+    def get_absent_count(self, obj):
+        return self._count(obj, 'absent_count', obj.attendances.filter(status='ABSENT'))
+
+    def get_visitor_count(self, obj):
+        return self._count(obj, 'visitor_count', obj.visitors.all())
+
+class RecurringEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringEvent
+        fields = '__all__'
 
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
         fields = '__all__'
 
+class AttendanceEntrySerializer(serializers.Serializer):
+    member = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=ATTENDANCE_STATUSES, default='PRESENT')
+
+
+class AttendanceBulkSerializer(serializers.Serializer):
+    MAX_ENTRIES = 2000
+
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    entries = AttendanceEntrySerializer(many=True, required=False, max_length=MAX_ENTRIES)
+    # Closing a service: members without any record for it are marked ABSENT
+    mark_others_absent = serializers.BooleanField(default=False)
+
+    def validate_entries(self, value):
+        # Later entries for the same member win, like taps replayed in order
+        statuses = {entry['member']: entry['status'] for entry in value}
+        known = set(Member.objects.filter(pk__in=statuses).values_list('pk', flat=True))
+        unknown = sorted(set(statuses) - known)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown members: {', '.join(map(str, unknown))}.")
+        return statuses
+
+    def validate(self, attrs):
+        if not attrs.get('entries') and not attrs['mark_others_absent']:
+            raise serializers.ValidationError('Provide entries or mark_others_absent.')
+        return attrs
+
 class VisitorSerializer(serializers.ModelSerializer):
+    # Visits under the same phone number, this one included; read from the
+    # visit_count annotation when present
+    visit_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Visitor
         fields = '__all__'
+        read_only_fields = ('member',)
+
+    def get_visit_count(self, obj):
+        if hasattr(obj, 'visit_count'):
+            return obj.visit_count or 1
+        if not obj.phone_key:
+            return 1
+        count = VisitorProfile.objects.filter(phone_key=obj.phone_key).values_list('visit_count', flat=True).first()
+        return count or 1
+
+class VisitorProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VisitorProfile
+        fields = '__all__'
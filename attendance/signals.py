@@ -0,0 +1,59 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .live import attendance_change, publish
+from .models import Attendance, Event, Visitor
+from .rollup import apply_changes, is_compacting
+from .serializers import VisitorSerializer
+from .visitors import refresh_profiles
+
+
+def _publish_on_commit(event_id, changes):
+    if not is_compacting():
+        # Archived rows leave the synced counts as they were
+        Event.objects.filter(pk=event_id).touch()
+    transaction.on_commit(partial(publish, event_id, changes))
+
+
+def attendance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        apply_changes([(instance.member_id, instance.event_id, instance.status)])
+        _publish_on_commit(instance.event_id, [attendance_change(instance)])
+
+
+def attendance_deleted(sender, instance, **kwargs):
+    apply_changes([(instance.member_id, instance.event_id, None)])
+    _publish_on_commit(instance.event_id, [
+        (('attendance', instance.member_id), {'type': 'attendance', 'member': instance.member_id, 'status': None}),
+    ])
+
+
+def remember_visitor_phone(sender, instance, raw=False, **kwargs):
+    instance._previous_phone_key = None
+    if not raw and not instance._state.adding:
+        instance._previous_phone_key = Visitor.objects.filter(pk=instance.pk).values_list('phone_key', flat=True).first()
+
+
+def visitor_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_profiles({instance.phone_key, getattr(instance, '_previous_phone_key', None)})
+    _publish_on_commit(instance.event_id, [
+        (('visitor', instance.pk), {'type': 'visitor', 'visitor': VisitorSerializer(instance).data}),
+    ])
+
+
+def visitor_deleted(sender, instance, **kwargs):
+    refresh_profiles({instance.phone_key})
+    _publish_on_commit(instance.event_id, [
+        (('visitor', instance.pk), {'type': 'visitor', 'visitor': {'id': instance.pk}, 'deleted': True}),
+    ])
+
+
+post_save.connect(attendance_saved, sender=Attendance, dispatch_uid='live_attendance_save')
+post_delete.connect(attendance_deleted, sender=Attendance, dispatch_uid='live_attendance_delete')
+pre_save.connect(remember_visitor_phone, sender=Visitor, dispatch_uid='visitor_profile_phone')
+post_save.connect(visitor_saved, sender=Visitor, dispatch_uid='live_visitor_save')
+post_delete.connect(visitor_deleted, sender=Visitor, dispatch_uid='live_visitor_delete')
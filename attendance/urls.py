@@ -1,12 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AttendanceViewSet, EventViewSet, VisitorViewSet
+from .views import AttendanceViewSet, CheckinLookupView, EventLiveView, EventViewSet, RecurringEventViewSet, VisitorProfileViewSet, VisitorViewSet
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet)
+router.register(r'recurring-events', RecurringEventViewSet)
 router.register(r'attendance', AttendanceViewSet)
 router.register(r'visitors', VisitorViewSet)
+router.register(r'visitor-profiles', VisitorProfileViewSet)
 
 urlpatterns = [
+    path('checkin/lookup/', CheckinLookupView.as_view(), name='checkin-lookup'),
+    path('events/<int:pk>/live/', EventLiveView.as_view(), name='event-live'),
     path('', include(router.urls)),
 ]
@@ -1,32 +1,124 @@
-from rest_framework import viewsets, permissions, status
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework import viewsets, permissions, status, views
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.response import Response
-from .models import Attendance, Event, Visitor
-from .serializers import AttendanceSerializer, EventSerializer, VisitorSerializer
+from rest_framework.utils.encoders import JSONEncoder
+from .checkin import member_lookup
+from .live import attendance_change, event_counts, get_broker, publish
+from .models import Attendance, Event, RecurringEvent, Visitor, VisitorProfile
+from .rollup import apply_changes
+from .schedule import assign_slot, current_event, is_one_off, reschedule, todays_events
+from .serializers import (
+    AttendanceBulkSerializer, AttendanceSerializer, EventSerializer, RecurringEventSerializer,
+    VisitorProfileSerializer, VisitorSerializer,
+)
+from .visitors import find_profile, link_member
+from members.models import Member
+from members.serializers import MemberSerializer
+from followups.engine import refresh_later as refresh_followups
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views import View
+from accounts.authentication import CachedJWTAuthentication
+from accounts.scoping import RowScopeMixin, get_scope, resolve_scope
+from core.exports import ExportMixin
+from core.mixins import ConditionalRequestMixin
 
-class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.all()
+class EventViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    # Counts only cover the caller's scope; see get_queryset
+    queryset = Event.objects.with_counts()
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ['is_service']
+    date_range_field = 'date'
+    keyset_ordering = ('-date', '-id')
+    conditional_related = ('attendances', 'visitors')
+
+    def get_queryset(self):
+        return Event.objects.with_counts(get_scope(self.request).ministry_ids)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            assign_slot(serializer.save())
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            event = serializer.save()
+            if is_one_off(event) and event.service_date != timezone.localdate(event.date):
+                assign_slot(event)
 
     @action(detail=False, methods=['get'])
     def today(self, request):
-        now = timezone.now()
-        # Find or create a service for today
-        event, created = Event.objects.get_or_create(
-            date__date=now.date(),
-            is_service=True,
-            defaults={'name': f"Sunday Service - {now.strftime('%d %b %Y')}", 'date': now}
-        )
+        """Today's check-in event: `?slot=` picks one, otherwise the service in progress."""
+        events = todays_events(ministry_ids=get_scope(request).ministry_ids)
+        slot = request.query_params.get('slot')
+        if slot:
+            event = next((event for event in events if event.slot == slot), None)
+            if event is None:
+                return Response({'error': 'No event in this slot today'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            event = current_event(events)
         serializer = self.get_serializer(event)
         return Response(serializer.data)
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class RecurringEventViewSet(viewsets.ModelViewSet):
+    queryset = RecurringEvent.objects.all()
+    serializer_class = RecurringEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ['weekday', 'is_service', 'active']
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            reschedule(serializer.save())
+
+    def perform_update(self, serializer):
+        slot = serializer.instance.slot
+        with transaction.atomic():
+            reschedule(serializer.save(), slot)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.active = False
+            reschedule(instance)
+            instance.delete()
+
+class AttendanceViewSet(RowScopeMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filterset_fields = ['event', 'member']
+    scope_path = 'member__'
+    filterset_fields = ['event', 'member', 'status']
+    date_range_field = 'event__date'
+    export_name = 'attendance'
+    export_fields = [
+        ('event', 'event__name'),
+        ('event_date', 'event__date'),
+        ('member_id', 'member__member_id'),
+        ('full_name', 'member__full_name'),
+        ('phone', 'member__phone'),
+        ('status', 'status'),
+        ('recorded_at', 'created_at'),
+    ]
+
+    def perform_create(self, serializer):
+        self.check_member(serializer.validated_data['member'])
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_member(serializer.validated_data.get('member', serializer.instance.member))
+        serializer.save()
+
+    def check_member(self, member):
+        if not get_scope(self.request).filter(Member.objects.filter(pk=member.pk)).exists():
+            raise PermissionDenied('Member is outside your ministries.')
 
     @action(detail=False, methods=['post'])
     def toggle(self, request):
@@ -35,25 +127,241 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         
         if not event_id or not member_id:
             return Response({'error': 'event and member are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not get_scope(request).filter(Member.objects.filter(pk=member_id)).exists():
+            return Response({'error': 'Member not found'}, status=status.HTTP_404_NOT_FOUND)
             
         attendance, created = Attendance.objects.get_or_create(
             event_id=event_id,
             member_id=member_id,
+            defaults={'status': 'PRESENT'},
         )
         
         if not created:
-            # If it already existed, toggle status or delete if we want "tick/untick"
-            # Here let's just toggle between PRESENT and ABSENT
+            # If it already existed, toggle between PRESENT and ABSENT
             attendance.status = 'PRESENT' if attendance.status == 'ABSENT' else 'ABSENT'
-            attendance.save()
-        else:
-            attendance.status = 'PRESENT'
-            attendance.save()
+            attendance.save(update_fields=['status', 'updated_at'])
             
         return Response(AttendanceSerializer(attendance).data)
 
-class VisitorViewSet(viewsets.ModelViewSet):
-    queryset = Visitor.objects.all()
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Record many check-ins at once: `{"event": 1, "entries": [{"member": 5,
+        "status": "PRESENT"}, ...], "mark_others_absent": false}`.
+
+        Entries are upserted on (member, event) with one INSERT ... ON
+        CONFLICT DO UPDATE, so replaying a batch is harmless. With
+        `mark_others_absent`, every member still without a record for the
+        event gets an ABSENT one. Ministry leaders can only write, and close
+        the service for, their own members. Responds with the event's records for the
+        members written.
+        """
+        serializer = AttendanceBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+        statuses = serializer.validated_data.get('entries', {})
+        scope = get_scope(request)
+        if not scope.is_full:
+            allowed = set(scope.filter(Member.objects.filter(pk__in=list(statuses))).values_list('pk', flat=True))
+            outside = sorted(set(statuses) - allowed)
+            if outside:
+                return Response({'error': f'Members outside your ministries: {outside}'}, status=status.HTTP_403_FORBIDDEN)
+
+        now = timezone.now()
+        with transaction.atomic():
+            Attendance.objects.bulk_create(
+                [Attendance(event=event, member_id=member_id, status=value, recorded_at=now) for member_id, value in statuses.items()],
+                update_conflicts=True,
+                unique_fields=['member', 'event'],
+                update_fields=['status', 'updated_at', 'recorded_at'],
+            )
+            marked_absent = 0
+            if serializer.validated_data['mark_others_absent']:
+                missing = scope.filter(Member.objects.all()).exclude(attendances__event=event).values_list('pk', flat=True)
+                absent = [Attendance(event=event, member_id=member_id, status='ABSENT', recorded_at=now) for member_id in missing.iterator()]
+                # A check-in racing the close keeps its status
+                Attendance.objects.bulk_create(absent, ignore_conflicts=True, batch_size=1000)
+                marked_absent = len(absent)
+
+            # bulk_create sends no signals; tell live devices directly
+            changes = [attendance_change(Attendance(event=event, member_id=member_id, status=value)) for member_id, value in statuses.items()]
+            if marked_absent:
+                changes += [attendance_change(record) for record in absent]
+            Event.objects.filter(pk=event.pk).touch()
+            transaction.on_commit(lambda: publish(event.pk, changes))
+            if event.ordinal is not None:
+                apply_changes([(member_id, event.pk, value) for member_id, value in statuses.items()])
+                if marked_absent:
+                    apply_changes([(record.member_id, event.pk, 'ABSENT') for record in absent])
+            if serializer.validated_data['mark_others_absent']:
+                # The service is closed: bring the follow-up queue up to date,
+                # off the request since it reads the whole history
+                transaction.on_commit(refresh_followups)
+
+        records = Attendance.objects.filter(event=event, member_id__in=list(statuses)).order_by('member_id')
+        return Response({
+            'event': event.pk,
+            'written': len(statuses),
+            'marked_absent': marked_absent,
+            'results': AttendanceSerializer(records, many=True).data,
+        })
+
+class VisitorViewSet(RowScopeMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Visitor.objects.annotate(visit_count=Subquery(
+        VisitorProfile.objects.filter(phone_key=OuterRef('phone_key')).values('visit_count')[:1]
+    ))
     serializer_class = VisitorSerializer
     permission_classes = [permissions.IsAuthenticated]
+    scope_path = None
     filterset_fields = ['event']
+    date_range_field = 'event__date'
+    export_name = 'visitors'
+    export_fields = [
+        ('event', 'event__name'),
+        ('event_date', 'event__date'),
+        ('full_name', 'full_name'),
+        ('phone_number', 'phone_number'),
+        ('residence', 'residence'),
+        ('recorded_at', 'created_at'),
+    ]
+
+class VisitorProfileViewSet(RowScopeMixin, viewsets.ReadOnlyModelViewSet):
+    """Visitors across events, one per phone number; `?returning=true` for those who came more than once."""
+    queryset = VisitorProfile.objects.all()
+    serializer_class = VisitorProfileSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    scope_path = None
+    filterset_fields = ['member']
+    date_range_field = 'last_seen'
+    keyset_ordering = ('-last_seen', '-id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        returning = self.request.query_params.get('returning')
+        if returning in ('true', 'True', '1'):
+            queryset = queryset.filter(visit_count__gt=1)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """`?phone=`: the visitor profile for a phone number, e.g. while registering a member."""
+        profile = find_profile(request.query_params.get('phone'), self.get_queryset())
+        if profile is None:
+            return Response({'error': 'No visitor with this phone number'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(profile).data)
+
+    @action(detail=True, methods=['post'])
+    def convert(self, request, pk=None):
+        """
+        Register the visitor as a member. The body is a member like for
+        POST /members/; name, phone and estate default to the visitor's.
+        """
+        data = request.data.copy()
+        with transaction.atomic():
+            profile = self.get_queryset().select_for_update().filter(pk=self.get_object().pk).get()
+            if profile.member_id:
+                return Response({'error': 'This visitor is already a member'}, status=status.HTTP_409_CONFLICT)
+            for field, value in (('full_name', profile.full_name), ('phone', profile.phone_number), ('estate', profile.residence)):
+                if value and not data.get(field):
+                    data[field] = value
+            serializer = MemberSerializer(data=data, context=self.get_serializer_context())
+            serializer.is_valid(raise_exception=True)
+            member = serializer.save()
+            visits = link_member(profile, member)
+        return Response({'member': serializer.data, 'visits': visits}, status=status.HTTP_201_CREATED)
+
+class CheckinLookupView(views.APIView):
+    """
+    `GET /checkin/lookup/?q=...&event=<id>`: members whose name, member id
+    or phone number (last digits) match, from the in-memory index, with
+    their attendance status for the event if one is given.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        rows = member_lookup.lookup(request.query_params.get('q', ''), limit=limit, ministry_ids=get_scope(request).ministry_ids)
+
+        statuses = {}
+        event_id = request.query_params.get('event')
+        if event_id and rows:
+            if not event_id.isdigit():
+                return Response({'error': 'event must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+            statuses = dict(
+                Attendance.objects.filter(event_id=event_id, member_id__in=[row[0] for row in rows])
+                .values_list('member_id', 'status')
+            )
+
+        return Response([{
+            'id': pk,
+            'member_id': member_id,
+            'full_name': full_name,
+            'phone': phone,
+            'status': statuses.get(pk),
+        } for pk, member_id, full_name, phone in rows])
+
+class EventLiveView(View):
+    """
+    `GET /events/<pk>/live/`: Server-Sent Events stream of check-ins,
+    visitor registrations and counts for one event. Needs the ASGI server;
+    authenticates with the same `Authorization: Bearer` header as the API.
+    Ministry leaders get their own members' check-ins and counts only, as
+    in the API; visitors are left out for them.
+    """
+
+    async def get(self, request, pk):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'error': 'Live updates need the ASGI server'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        try:
+            authenticated = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({'error': str(exc.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        if authenticated is None:
+            return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=status.HTTP_401_UNAUTHORIZED)
+        scope = await sync_to_async(resolve_scope)(authenticated[0])
+        if not scope.is_full and not scope.ministry_ids:
+            return JsonResponse({'error': 'You do not have permission to perform this action.'}, status=status.HTTP_403_FORBIDDEN)
+        counts = await sync_to_async(event_counts)(pk, scope.ministry_ids)
+        if counts is None:
+            return JsonResponse({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(self.stream(pk, counts, scope), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx and similar proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def format(self, name, data):
+        return f'event: {name}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+    def scoped(self, event_id, message, scope):
+        """`message` as `scope` sees it: its members' check-ins only, and their counts."""
+        message = dict(message, counts=event_counts(event_id, scope.ministry_ids))
+        if 'changes' in message:
+            changes = [change for change in message['changes'] if change['type'] == 'attendance']
+            allowed = set(
+                scope.filter(Member.objects.filter(pk__in={change['member'] for change in changes}))
+                .values_list('pk', flat=True)
+            ) if changes else set()
+            message['changes'] = [change for change in changes if change['member'] in allowed]
+        return message
+
+    async def stream(self, event_id, counts, scope):
+        subscription = get_broker().subscribe(event_id)
+        try:
+            yield 'retry: 3000\n\n' + self.format('counts', counts)
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), settings.LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if not scope.is_full:
+                    message = await sync_to_async(self.scoped)(event_id, message, scope)
+                yield self.format('update', message)
+        finally:
+            subscription.close()
@@ -0,0 +1,76 @@
+"""
+Visitor profiles: everyone who has visited under one phone number.
+
+Visitor rows are per event; profiles aggregate them by the indexed
+phone_key (first and last visit, number of visits, latest details).
+Saving or deleting a visitor recomputes just the profiles of the phone
+keys involved, so profiles stay current without full scans.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from core.utils import normalize_phone
+from .models import Visitor, VisitorProfile
+
+PROFILE_FIELDS = ['full_name', 'phone_number', 'residence', 'first_seen', 'last_seen', 'visit_count', 'updated_at']
+
+
+def refresh_profiles(phone_keys=None):
+    """Recompute the profiles of `phone_keys` (every profile when None) from their visits."""
+    started = timezone.now()
+    visits = Visitor.objects.exclude(phone_key='')
+    if phone_keys is not None:
+        phone_keys = {key for key in phone_keys if key}
+        if not phone_keys:
+            return
+        visits = visits.filter(phone_key__in=phone_keys)
+    totals = (
+        visits.values('phone_key')
+        .annotate(first_seen=Min('event__date'), last_seen=Max('event__date'), visit_count=Count('id'))
+        .order_by()
+        .values_list('phone_key', 'first_seen', 'last_seen', 'visit_count')
+    )
+    latest = {}
+    details = visits.order_by('phone_key', '-event__date', '-id').values_list('phone_key', 'full_name', 'phone_number', 'residence')
+    for key, full_name, phone_number, residence in details.iterator(chunk_size=2000):
+        latest.setdefault(key, (full_name, phone_number, residence))
+
+    profiles = []
+    for key, first_seen, last_seen, visit_count in totals:
+        full_name, phone_number, residence = latest[key]
+        profiles.append(VisitorProfile(
+            phone_key=key, full_name=full_name, phone_number=phone_number, residence=residence,
+            first_seen=first_seen, last_seen=last_seen, visit_count=visit_count,
+        ))
+    with transaction.atomic():
+        VisitorProfile.objects.bulk_create(
+            profiles, batch_size=1000,
+            update_conflicts=True, unique_fields=['phone_key'], update_fields=PROFILE_FIELDS,
+        )
+        # Not written above: nobody left under these numbers. Converted
+        # profiles are kept for the record.
+        gone = VisitorProfile.objects.filter(updated_at__lt=started)
+        if phone_keys is not None:
+            gone = gone.filter(phone_key__in=phone_keys)
+        gone.filter(member__isnull=True).delete()
+        gone.exclude(visit_count=0).update(visit_count=0)
+
+
+def find_profile(phone, profiles=None):
+    """The visitor profile for a phone number in any format, out of `profiles` (all by default), with one indexed query."""
+    phone_key = normalize_phone(phone)
+    if not phone_key:
+        return None
+    if profiles is None:
+        profiles = VisitorProfile.objects.all()
+    return profiles.filter(phone_key=phone_key).first()
+
+
+@transaction.atomic
+def link_member(profile, member):
+    """Record that `profile` registered as `member` and point their visits at it; returns the visits linked."""
+    profile.member = member
+    profile.converted_at = timezone.now()
+    profile.save(update_fields=['member', 'converted_at', 'updated_at'])
+    return Visitor.objects.filter(phone_key=profile.phone_key).update(member=member, updated_at=timezone.now())
@@ -3,14 +3,53 @@ ASGI config for church_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Only the live check-in stream is served natively over ASGI; every other
+request goes through the WSGI handler, each on a worker thread of its own, so
+the sync API views run concurrently and streamed exports are sent as they are
+produced.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
 
 import os
+import re
 
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
 from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'church_system.settings')
 
-application = get_asgi_application()
+ASGI_PATHS = re.compile(r'^/api/v1/events/\d+/live/$')
+
+asgi_application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+
+def closing(app):
+    # WsgiToAsgi never closes the response, which is what fires
+    # request_finished and releases the database connection
+    def wrapped(environ, start_response):
+        response = app(environ, start_response)
+        try:
+            yield from response
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+    return wrapped
+
+
+class WsgiInstance(WsgiToAsgiInstance):
+    # Not thread-sensitive: the default would queue every request on one thread
+    run_wsgi_app = sync_to_async(
+        vars(WsgiToAsgiInstance)['run_wsgi_app'].func, thread_sensitive=False
+    )
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and not ASGI_PATHS.match(scope['path']):
+        await WsgiInstance(closing(wsgi_application))(scope, receive, send)
+    else:
+        await asgi_application(scope, receive, send)
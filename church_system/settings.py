@@ -40,6 +40,11 @@ INSTALLED_APPS = [
     'ministries',
     'attendance',
     'core',
+    'search',
+    'sync',
+    'stats',
+    'analytics',
+    'followups',
 ]
 
 MIDDLEWARE = [
@@ -128,13 +133,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_FILTER_BACKENDS': (
+        'core.filters.FieldFilterBackend',
+        'core.filters.DateRangeFilterBackend',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', '50')),
 }
 
+# Upper bound for ?page_size= on list endpoints
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv('PAGINATION_MAX_PAGE_SIZE', '500'))
+
+# Offline sync: how long the watermark lags behind now, and how long
+# deletions are remembered before clients have to resync from scratch
+SYNC_SAFETY_WINDOW_SECONDS = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+# How long computed analytics reports are reused
+ANALYTICS_CACHE_SECONDS = int(os.getenv('ANALYTICS_CACHE_SECONDS', '300'))
+
+# Live check-in updates: the in-process broker only reaches clients of the
+# same process, so run a single uvicorn process (the API itself runs on
+# threads, see asgi.py) or plug in a shared broker before adding workers
+LIVE_BROKER = os.getenv('LIVE_BROKER', 'attendance.live.InProcessBroker')
+LIVE_COALESCE_SECONDS = 0.25
+LIVE_HEARTBEAT_SECONDS = 15
+
+# Follow-up queue: services missed before a member is flagged, how long a
+# newcomer's "first month" is, and how far back newcomers and visitors count
+FOLLOWUP_MISSED_SERVICES = 3
+FOLLOWUP_NEWCOMER_DAYS = 30
+FOLLOWUP_NEWCOMER_MISSED_SERVICES = 2
+FOLLOWUP_VISITOR_MISSED_SERVICES = 2
+FOLLOWUP_LOOKBACK_DAYS = 180
+
+# Recurring events: how far ahead occurrences are created, and how long
+# before its start time a service becomes today's check-in event
+SCHEDULE_DAYS_AHEAD = 28
+SCHEDULE_CHECKIN_OPEN_MINUTES = 30
+
+# Attendance rollup: services this old are folded into yearly bitsets, and
+# `rollup_attendance --compact` deletes raw rows this old, keeping each
+# member's first and last present service for the follow-up engine (event
+# counts and the analytics reports read raw rows, so they only cover the
+# retained period)
+ATTENDANCE_ROLLUP_AFTER_DAYS = 35
+ATTENDANCE_RAW_RETENTION_DAYS = 3 * 365
+
+# API authentication: how long a user looked up for a token is reused, or
+# (stateless) build users from the token claims without any lookup
+AUTH_USER_CACHE_SECONDS = int(os.getenv('AUTH_USER_CACHE_SECONDS', '30'))
+AUTH_STATELESS_USERS = os.getenv('AUTH_STATELESS_USERS', 'False') == 'True'
+
 # Simple JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -10,6 +10,9 @@ urlpatterns = [
     path('api/v1/', include('members.urls')),
     path('api/v1/', include('ministries.urls')),
     path('api/v1/', include('attendance.urls')),
+    path('api/v1/', include('sync.urls')),
+    path('api/v1/', include('analytics.urls')),
+    path('api/v1/', include('followups.urls')),
     
     # Catch-all for Frontend (React)
     re_path(r'^.*$', TemplateView.as_view(template_name='index.html')),
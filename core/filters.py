@@ -0,0 +1,75 @@
+import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class FieldFilterBackend(BaseFilterBackend):
+    """Exact-match filtering on the view's `filterset_fields`, e.g. ?event=3&saved=true."""
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        for name in getattr(view, 'filterset_fields', ()):
+            value = request.query_params.get(name)
+            if value in (None, ''):
+                continue
+            field = queryset.model._meta.get_field(name)
+            try:
+                if isinstance(field, models.BooleanField):
+                    # Accept the same spellings as the API itself (true/false/yes/no...)
+                    filters[name] = serializers.BooleanField().to_internal_value(value)
+                else:
+                    filters[name] = field.to_python(value)
+            except (DjangoValidationError, ValidationError):
+                raise ValidationError({name: ['Invalid value.']})
+        return queryset.filter(**filters)
+
+
+class DateRangeFilterBackend(BaseFilterBackend):
+    """
+    `?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD` (both inclusive) on the view's
+    `date_range_field`. Datetime fields are compared against day boundaries
+    rather than with `__date`, so an index on the column can be used.
+    """
+    from_param = 'date_from'
+    to_param = 'date_to'
+
+    def filter_queryset(self, request, queryset, view):
+        field_path = getattr(view, 'date_range_field', None)
+        if not field_path:
+            return queryset
+        is_datetime = isinstance(self._resolve(queryset.model, field_path), models.DateTimeField)
+        bounds = self.get_bounds(request, is_datetime)
+        return queryset.filter(**{f'{field_path}__{lookup}': value for lookup, value in bounds.items()})
+
+    def get_bounds(self, request, is_datetime=True):
+        """The requested range as {'gte': start, 'lt': end}, either key missing when open."""
+        bounds = {}
+        for param, lookup in ((self.from_param, 'gte'), (self.to_param, 'lt')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                date = parse_date(value)
+                if date is not None and lookup == 'lt':
+                    # Inclusive end date: everything before the following day
+                    date += datetime.timedelta(days=1)
+            except (ValueError, OverflowError):
+                raise ValidationError({param: ['Not a valid date.']})
+            if date is None:
+                raise ValidationError({param: ['Use the YYYY-MM-DD format.']})
+            if is_datetime:
+                date = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+            bounds[lookup] = date
+        return bounds
+
+    def _resolve(self, model, field_path):
+        *relations, name = field_path.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
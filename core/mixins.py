@@ -0,0 +1,233 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Restrict `queryset` to the columns `serializer` reads and join the
+    relations it follows, so rendering a page costs a fixed number of queries.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = queryset.model
+    if getattr(getattr(serializer, 'Meta', None), 'model', None) is not model:
+        return queryset
+
+    only, select, prefetch = {'pk'}, set(), set()
+    restrict = True
+    for field in serializer.fields.values():
+        if field.source == '*':
+            # Method fields may read anything on the instance
+            restrict = False
+            continue
+        parts = field.source.split('.')
+        try:
+            model_field = model._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            restrict = False
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.add(parts[0])
+        elif model_field.is_relation and len(parts) > 1:
+            select.add(parts[0])
+            only.update((parts[0], '__'.join(parts)))
+        else:
+            only.add(parts[0])
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if restrict:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin for `?fields=a,b` and `?expand=children` on read requests.
+
+    The requested fieldset is handed to the serializer and used to trim the
+    SQL with `.only()`, `select_related()` and `prefetch_related()`. List
+    requests use `list_serializer_class` when it is set.
+    """
+    list_serializer_class = None
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in permissions.SAFE_METHODS:
+            kwargs.setdefault('fields', self._query_list(self.fields_query_param))
+            kwargs.setdefault('expand', self._query_list(self.expand_query_param))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
+
+    def _query_list(self, param):
+        value = self.request.query_params.get(param, '')
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class ConditionalRequestMixin:
+    """
+    ETag / Last-Modified support for ModelViewSets over TimeStampedModels.
+
+    Validators cover the rows in the response (ids and updated_at) and, for
+    each relation in `conditional_related` whose changes show up in the
+    payload, a count and MAX(updated_at) over the rows pointing at them, so
+    `If-None-Match` / `If-Modified-Since` can be answered with a 304 before
+    anything is serialized. Lists take them from the page being served,
+    which is read anyway, rather than from the whole table. `If-Match` /
+    `If-Unmodified-Since` on PUT, PATCH and DELETE give optimistic
+    concurrency: a stale validator gets a 412.
+    """
+    conditional_related = ()
+
+    def get_validators(self, queryset):
+        queryset = queryset.order_by()
+        values = queryset.aggregate(count=Count('pk'), last=Max('updated_at'))
+        values.update(self._related_validators(queryset))
+        return (values['count'], *self._validators(values))
+
+    def get_page_validators(self, rows, total=None):
+        """Validators of a page of already fetched `rows`, out of `total` when the response has a count."""
+        values = {
+            'rows': ','.join(f'{row.pk}:{row.updated_at.isoformat()}' for row in rows),
+            'total': total,
+            'last': max((row.updated_at for row in rows), default=None),
+        }
+        values.update(self._related_validators(rows))
+        return self._validators(values)
+
+    def _related_validators(self, rows):
+        # One aggregate per relation on its own table: joining them all to
+        # the base rows would multiply the rows being aggregated
+        values = {}
+        for relation in self.conditional_related:
+            related = self._related_rows(rows, relation).order_by().aggregate(count=Count('pk'), last=Max('updated_at'))
+            values[f'{relation}_count'] = related['count']
+            values[f'{relation}_last'] = related['last']
+        return values
+
+    def _validators(self, values):
+        timestamps = [value for name, value in values.items() if name.endswith('_last') or name == 'last']
+        timestamps = [value for value in timestamps if value is not None]
+        last_modified = max(timestamps) if timestamps else None
+        # Caches key on the full URL, so the query string needn't be part of the tag
+        key = '|'.join(
+            [self.request.path, str(self.request.user.pk)]
+            + [f'{name}={values[name]}' for name in sorted(values)]
+        )
+        return f'"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+    def _related_rows(self, rows, relation):
+        """Rows of `relation` for `rows`, a queryset or a list of instances."""
+        field = self.queryset.model._meta.get_field(relation)
+        if field.auto_created and not field.concrete:
+            # Reverse relation: rows pointing at the base rows
+            return field.related_model._default_manager.filter(**{f'{field.field.name}__in': rows})
+        if isinstance(rows, QuerySet):
+            ids = rows.values(field.attname)
+        else:
+            ids = {getattr(row, field.attname) for row in rows}
+        return field.related_model._default_manager.filter(pk__in=ids)
+
+    def _with_validator_fields(self, queryset):
+        # Sparse fieldsets may defer what the page validators read
+        needed = {'updated_at'} | {
+            relation for relation in self.conditional_related
+            if queryset.model._meta.get_field(relation).concrete
+        }
+        fields, defer = queryset.query.deferred_loading
+        if defer:
+            return queryset.defer(None).defer(*(set(fields) - needed)) if needed & set(fields) else queryset
+        return queryset.only(*(set(fields) | needed)) if fields else queryset
+
+    def _object_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def _conditional_response(self, etag, last_modified):
+        return get_conditional_response(
+            self.request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def _set_validators(self, response, etag, last_modified):
+        if etag and response.status_code < 300:
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self._with_validator_fields(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            rows, total = list(queryset), None
+        else:
+            rows, total = page, getattr(self.paginator, 'count', None)
+        etag, last_modified = self.get_page_validators(rows, total)
+        not_modified = self._conditional_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(rows, many=True)
+        response = Response(serializer.data) if page is None else self.get_paginated_response(serializer.data)
+        return self._set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        count, etag, last_modified = self.get_validators(self._object_queryset())
+        if not count:
+            return super().retrieve(request, *args, **kwargs)
+        not_modified = self._conditional_response(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def _check_preconditions(self):
+        headers = self.request.headers
+        if 'If-Match' not in headers and 'If-Unmodified-Since' not in headers:
+            return None
+        queryset = self._object_queryset()
+        # Hold the row until the write commits so the check can't go stale
+        list(queryset.select_for_update().values_list('pk', flat=True))
+        count, etag, last_modified = self.get_validators(queryset)
+        if not count:
+            return None
+        return self._conditional_response(etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            failed = self._check_preconditions()
+            if failed is not None:
+                return failed
+            response = super().update(request, *args, **kwargs)
+        _, etag, last_modified = self.get_validators(self._object_queryset())
+        return self._set_validators(response, etag, last_modified)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            failed = self._check_preconditions()
+            if failed is not None:
+                return failed
+            return super().destroy(request, *args, **kwargs)
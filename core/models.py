@@ -6,3 +6,8 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+        # Keyset pagination seeks on (created_at, id), delta sync on (updated_at, id)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='%(class)s_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='%(class)s_updated_idx'),
+        ]
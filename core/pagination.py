@@ -0,0 +1,145 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on an ordered key such as (created_at, id).
+
+    Each page is a `WHERE key < last_key ORDER BY key LIMIT n` query, so page
+    1000 costs the same as page 1. Cursors are opaque base64 tokens holding the
+    boundary key and the direction of travel.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true', 'True'):
+            self.count = queryset.count()
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+
+        # Fetch one extra row to know whether there is anything beyond this page
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        # A stale cursor can leave an empty page however far the data goes
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        position = [self._key_value(obj, field) for field in self.ordering]
+        token = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = urlsafe_b64encode(token.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        # The count is only needed for the first page, don't repeat it
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            values = data['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return position, bool(data.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _key_value(self, obj, field):
+        value = getattr(obj, field.lstrip('-'))
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def _flip(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _seek(self, ordering, position):
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per field direction
+        clauses = []
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): position[j] for j, f in enumerate(ordering[:i])}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[i]}))
+        return reduce(or_, clauses)
@@ -0,0 +1,20 @@
+class SparseFieldsetMixin:
+    """
+    Serializer mixin accepting `fields` and `expand` keyword arguments.
+
+    `fields` trims the output to the named fields and `expand` switches on the
+    heavier fields listed in `Meta.expandable_fields`, which are left out
+    unless asked for.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = set(expand or ())
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                self.fields.pop(name, None)
+        if fields:
+            allowed = set(fields) | expand
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
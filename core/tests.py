@@ -1,3 +1,107 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from members.models import Member
+
+
+class APITestCase(TestCase):
+    role = User.Role.BISHOP
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', password='secret123', role=self.role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.members = [Member.objects.create(full_name=f'Member {i}', phone=f'07000000{i:02}') for i in range(7)]
+        # Newest first, ties on created_at broken by id
+        self.expected = [m.pk for m in sorted(self.members, key=lambda m: (m.created_at, m.pk), reverse=True)]
+
+    def ids(self, response):
+        return [row['id'] for row in response.data['results']]
+
+    def test_next_and_previous_links_walk_the_list(self):
+        first = self.client.get(reverse('member-list'), {'page_size': 3, 'count': 1})
+        self.assertEqual(first.data['count'], 7)
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(self.ids(first), self.expected[:3])
+
+        second = self.client.get(first.data['next'])
+        self.assertNotIn('count', second.data)
+        self.assertEqual(self.ids(second), self.expected[3:6])
+
+        third = self.client.get(second.data['next'])
+        self.assertEqual(self.ids(third), self.expected[6:])
+        self.assertIsNone(third.data['next'])
+
+        back = self.client.get(third.data['previous'])
+        self.assertEqual(self.ids(back), self.expected[3:6])
+        back = self.client.get(back.data['previous'])
+        self.assertEqual(self.ids(back), self.expected[:3])
+        self.assertIsNone(back.data['previous'])
+
+    def test_empty_pages_have_no_links(self):
+        Member.objects.all().delete()
+        response = self.client.get(reverse('member-list'))
+        self.assertEqual(response.data['results'], [])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_stale_cursor_gives_an_empty_page(self):
+        first = self.client.get(reverse('member-list'), {'page_size': 3})
+        Member.objects.filter(pk__in=self.expected[3:]).delete()
+        response = self.client.get(first.data['next'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('member-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.member = Member.objects.create(full_name='Jane Doe', phone='0700000001')
+        self.url = reverse('member-detail', args=[self.member.pk])
+
+    def test_unchanged_object_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.patch(self.url, {'full_name': 'Jane Roe'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get(reverse('member-list'))['ETag']
+        response = self.client.get(reverse('member-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Member.objects.create(full_name='John Doe', phone='0700000002')
+        response = self.client.get(reverse('member-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_if_match_is_rejected(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'full_name': 'Jane Roe'}, format='json', HTTP_IF_MATCH=etag)
+
+        response = self.client.patch(self.url, {'full_name': 'Janet Doe'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.full_name, 'Jane Roe')
+
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'full_name': 'Janet Doe'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,61 @@
+import re
+
+NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(phone, country_code='254'):
+    """
+    Reduce a phone number to its national format, e.g. '+254 712-345 678',
+    '254712345678' and '0712345678' all become '0712345678'.
+    """
+    if not phone:
+        return ''
+    digits = NON_DIGITS.sub('', phone)
+    if digits.startswith(country_code) and len(digits) > 9:
+        digits = '0' + digits[len(country_code):]
+    elif len(digits) == 9 and not digits.startswith('0'):
+        digits = '0' + digits
+    return digits
+
+
+NON_LETTERS = re.compile(r'[^a-z ]')
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def name_tokens(name):
+    return NON_LETTERS.sub(' ', (name or '').lower()).split()
+
+
+def soundex(word):
+    if not word:
+        return ''
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0], '')
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def name_key(name):
+    """
+    Phonetic blocking key for a person's name, independent of word order:
+    'John Kamau', 'Kamau Jon' and 'JOHN M. KAMAU' share the key 'J500-K500'.
+    """
+    tokens = name_tokens(name)
+    if not tokens:
+        return ''
+    return '-'.join(sorted({soundex(tokens[0]), soundex(tokens[-1])}))
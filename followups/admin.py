@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import FollowUp
+
+@admin.register(FollowUp)
+class FollowUpAdmin(admin.ModelAdmin):
+    list_display = ('reason', 'member', 'visitor', 'missed_services', 'status', 'last_seen')
+    list_filter = ('reason', 'status')
+    raw_id_fields = ('member', 'visitor')
@@ -0,0 +1,154 @@
+"""
+Follow-up detection over the whole attendance history.
+
+Members are read as one GROUP BY over present attendances (first and last
+service attended per member) and classified in a single pass against the
+sorted list of service dates. Visitors who came once are found with
+window functions partitioned by phone number. `refresh()` then applies
+the difference to the FollowUp queue: new cases are opened, open cases
+whose person came back are resolved, and handled cases are not reopened
+for the same absence.
+
+Requests that close a service call `refresh_later()`, which runs the
+refresh on a background thread instead of inside the request.
+"""
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from attendance.models import Attendance, Event, Visitor
+from members.models import Member
+from .models import FollowUp
+
+
+def _service_dates(now):
+    return list(Event.objects.filter(is_service=True, date__lte=now).order_by('date').values_list('date', flat=True))
+
+
+def member_cases(services, now):
+    """(reason, member pk, last seen, services missed since) for members to follow up."""
+    newcomer_since = now - timedelta(days=settings.FOLLOWUP_LOOKBACK_DAYS)
+    first_month = timedelta(days=settings.FOLLOWUP_NEWCOMER_DAYS)
+    attended = (
+        Attendance.objects.filter(status='PRESENT', event__is_service=True, event__date__lte=now)
+        .values('member')
+        .annotate(first=Min('event__date'), last=Max('event__date'))
+        .order_by()
+        .values_list('member', 'first', 'last')
+    )
+    for member_id, first, last in attended.iterator(chunk_size=2000):
+        missed = len(services) - bisect_right(services, last)
+        if first >= newcomer_since and last - first <= first_month and missed >= settings.FOLLOWUP_NEWCOMER_MISSED_SERVICES:
+            yield 'LAPSED_NEWCOMER', member_id, last, missed
+        elif missed >= settings.FOLLOWUP_MISSED_SERVICES:
+            yield 'MISSED_SERVICES', member_id, last, missed
+
+
+def visitor_cases(services, now):
+    """
+    Visitors seen at exactly one event in the lookback window who haven't
+    come back for FOLLOWUP_VISITOR_MISSED_SERVICES services and haven't
+    registered as members. Visits are grouped by phone number, so visitors
+    without one can't be told apart and are left out.
+    """
+    since = now - timedelta(days=settings.FOLLOWUP_LOOKBACK_DAYS)
+    partition = [F('phone_key')]
+    visits = (
+        Visitor.objects.exclude(phone_key='')
+        .annotate(
+            visits=Window(Count('id'), partition_by=partition),
+            visit_number=Window(RowNumber(), partition_by=partition, order_by=[F('event__date').asc(), F('id').asc()]),
+        )
+        .filter(visits=1, visit_number=1, event__date__gte=since, event__date__lte=now)
+        .exclude(phone_key__in=Member.objects.exclude(phone_key='').values('phone_key'))
+        .values_list('id', 'event__date')
+    )
+    for visitor_id, visited in visits.iterator(chunk_size=2000):
+        missed = len(services) - bisect_right(services, visited)
+        if missed >= settings.FOLLOWUP_VISITOR_MISSED_SERVICES:
+            yield 'VISITOR_NOT_RETURNED', visitor_id, visited, missed
+
+
+@transaction.atomic
+def refresh(now=None):
+    """Bring the FollowUp queue up to date; returns counts of opened, updated and resolved cases."""
+    now = now or timezone.now()
+    services = _service_dates(now)
+    cases = {}
+    for reason, member_id, last_seen, missed in member_cases(services, now):
+        cases[(reason, member_id, None)] = (last_seen, missed)
+    for reason, visitor_id, last_seen, missed in visitor_cases(services, now):
+        cases[(reason, None, visitor_id)] = (last_seen, missed)
+
+    # Every episode ever recorded, by person and last_seen, so handled ones stay closed
+    seen = set()
+    active = {}
+    for followup in FollowUp.objects.only('id', 'reason', 'member_id', 'visitor_id', 'last_seen', 'missed_services', 'status'):
+        key = (followup.reason, followup.member_id, followup.visitor_id)
+        seen.add((key, followup.last_seen))
+        if followup.status in ('OPEN', 'CONTACTED'):
+            active[key] = followup
+
+    to_create, to_update, to_resolve = [], [], []
+    for key, (last_seen, missed) in cases.items():
+        followup = active.pop(key, None)
+        if followup is not None and followup.last_seen == last_seen:
+            if followup.missed_services != missed:
+                followup.missed_services = missed
+                followup.updated_at = now
+                to_update.append(followup)
+            continue
+        if followup is not None:
+            # They came back and lapsed again: close the old episode
+            to_resolve.append(followup)
+        if (key, last_seen) not in seen:
+            reason, member_id, visitor_id = key
+            to_create.append(FollowUp(
+                reason=reason, member_id=member_id, visitor_id=visitor_id,
+                last_seen=last_seen, missed_services=missed,
+            ))
+    # Still active but no longer a case: they came back
+    to_resolve += [followup for followup in active.values() if followup.status == 'OPEN']
+    for followup in to_resolve:
+        followup.status = 'RESOLVED'
+        followup.resolved_at = now
+        followup.updated_at = now
+
+    FollowUp.objects.bulk_create(to_create, batch_size=1000)
+    FollowUp.objects.bulk_update(to_update, ['missed_services', 'updated_at'], batch_size=1000)
+    FollowUp.objects.bulk_update(to_resolve, ['status', 'resolved_at', 'updated_at'], batch_size=1000)
+    return {'opened': len(to_create), 'updated': len(to_update), 'resolved': len(to_resolve)}
+
+
+_running = threading.Lock()
+_requested = threading.Event()
+
+
+def refresh_later():
+    """
+    Run `refresh()` on a background thread. One runs at a time; calls made
+    while it runs are folded into a single further run.
+    """
+    _requested.set()
+    if _running.acquire(blocking=False):
+        threading.Thread(target=_refresh_requested, daemon=True).start()
+
+
+def _refresh_requested():
+    while True:
+        try:
+            while _requested.is_set():
+                _requested.clear()
+                refresh()
+        finally:
+            connections.close_all()
+            _running.release()
+        # A call that came in as this run finished found the lock still held
+        if not _requested.is_set() or not _running.acquire(blocking=False):
+            return
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from followups.engine import refresh
+
+
+class Command(BaseCommand):
+    help = 'Update the pastoral follow-up queue from the attendance history'
+
+    def handle(self, *args, **options):
+        counts = refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Opened {counts['opened']}, updated {counts['updated']}, resolved {counts['resolved']} follow-ups"
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('attendance', '0007_attendance_recorded_at'),
+        ('members', '0008_child_child_updated_idx_member_member_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowUp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reason', models.CharField(choices=[('MISSED_SERVICES', 'Missed recent services'), ('LAPSED_NEWCOMER', 'Stopped coming after first month'), ('VISITOR_NOT_RETURNED', 'Visitor never came back')], max_length=30)),
+                ('last_seen', models.DateTimeField()),
+                ('missed_services', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('CONTACTED', 'Contacted'), ('RESOLVED', 'Resolved'), ('DISMISSED', 'Dismissed')], default='OPEN', max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('member', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='followups', to='members.member')),
+                ('visitor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='followups', to='attendance.visitor')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['created_at', 'id'], name='followup_created_idx'), models.Index(fields=['updated_at', 'id'], name='followup_updated_idx'), models.Index(fields=['status', 'reason'], name='followup_status_idx')],
+            },
+        ),
+    ]
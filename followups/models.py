@@ -0,0 +1,36 @@
+from django.db import models
+from core.models import TimeStampedModel
+from attendance.models import Visitor
+from members.models import Member
+
+class FollowUp(TimeStampedModel):
+    REASON_CHOICES = [
+        ('MISSED_SERVICES', 'Missed recent services'),
+        ('LAPSED_NEWCOMER', 'Stopped coming after first month'),
+        ('VISITOR_NOT_RETURNED', 'Visitor never came back'),
+    ]
+    STATUS_CHOICES = [
+        ('OPEN', 'Open'),
+        ('CONTACTED', 'Contacted'),
+        ('RESOLVED', 'Resolved'),
+        ('DISMISSED', 'Dismissed'),
+    ]
+
+    reason = models.CharField(max_length=30, choices=REASON_CHOICES)
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, null=True, blank=True, related_name='followups')
+    visitor = models.ForeignKey(Visitor, on_delete=models.CASCADE, null=True, blank=True, related_name='followups')
+    # Last attended service; a new date means a new episode for the same person
+    last_seen = models.DateTimeField()
+    missed_services = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OPEN')
+    notes = models.TextField(blank=True)
+    resolved_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = TimeStampedModel.Meta.indexes + [
+            models.Index(fields=['status', 'reason'], name='followup_status_idx'),
+        ]
+
+    def __str__(self):
+        person = self.member or self.visitor
+        return f"{self.get_reason_display()}: {person}"
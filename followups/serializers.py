@@ -0,0 +1,30 @@
+from django.utils import timezone
+from rest_framework import serializers
+from .models import FollowUp
+
+class FollowUpSerializer(serializers.ModelSerializer):
+    # Whoever the case is about, member or visitor
+    name = serializers.SerializerMethodField()
+    phone = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FollowUp
+        fields = (
+            'id', 'reason', 'member', 'visitor', 'name', 'phone', 'last_seen',
+            'missed_services', 'status', 'notes', 'resolved_at', 'created_at', 'updated_at',
+        )
+        read_only_fields = (
+            'reason', 'member', 'visitor', 'last_seen', 'missed_services', 'resolved_at',
+        )
+
+    def get_name(self, obj):
+        return obj.member.full_name if obj.member_id else obj.visitor.full_name
+
+    def get_phone(self, obj):
+        return obj.member.phone if obj.member_id else obj.visitor.phone_number
+
+    def update(self, instance, validated_data):
+        status = validated_data.get('status', instance.status)
+        if status != instance.status:
+            instance.resolved_at = timezone.now() if status in ('RESOLVED', 'DISMISSED') else None
+        return super().update(instance, validated_data)
@@ -0,0 +1,22 @@
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from accounts.scoping import HasFullScope, RowScopeMixin
+from .engine import refresh
+from .models import FollowUp
+from .serializers import FollowUpSerializer
+
+class FollowUpViewSet(RowScopeMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet):
+    """
+    The pastoral follow-up queue, newest first. Filter with ?status=OPEN
+    and ?reason=...; PATCH status and notes as cases are handled.
+    """
+    queryset = FollowUp.objects.select_related('member', 'visitor')
+    serializer_class = FollowUpSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    scope_path = 'member__'
+    filterset_fields = ['status', 'reason', 'member', 'visitor']
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated, HasFullScope])
+    def refresh(self, request):
+        return Response(refresh())
@@ -1,5 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
-import api from '../../services/api';
+import api, { fetchAll } from '../../services/api';
+import { subscribeToEvent } from '../../services/live';
+import { enqueue, flush } from '../../services/offlineQueue';
 import {
     Calendar, Users, CheckCircle2, Search, Plus, ArrowRight,
     Clock, UserCheck, Sparkles, LayoutGrid, List, UserPlus,
@@ -26,6 +28,7 @@ const Attendance = () => {
     const [attendanceMap, setAttendanceMap] = useState({});
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
+    const [lookupResults, setLookupResults] = useState(null);
     const [view, setView] = useState('events'); // 'events' or 'record'
     const [layout, setLayout] = useState('list'); // 'grid' or 'list'
     const [activeTab, setActiveTab] = useState('members'); // 'members' or 'visitors'
@@ -52,17 +55,76 @@ const Attendance = () => {
 
     useEffect(() => {
         fetchInitialData();
+        // Upload check-ins left over from an earlier offline session
+        flush().catch(() => {});
     }, []);
 
+    // Check-ins made on other devices for the open event
+    useEffect(() => {
+        if (!selectedEvent) return undefined;
+        return subscribeToEvent(selectedEvent.id, {
+            update: (message) => {
+                if (message.resync) {
+                    fetchAttendanceAndVisitors(selectedEvent.id);
+                    return;
+                }
+                message.changes.forEach(applyLiveChange);
+            },
+        });
+    }, [selectedEvent?.id]);
+
+    useEffect(() => {
+        const query = searchTerm.trim();
+        if (activeTab !== 'members' || !query) {
+            setLookupResults(null);
+            return undefined;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const res = await api.get('checkin/lookup/', {
+                    params: { q: query, event: selectedEvent?.id }
+                });
+                if (!cancelled) setLookupResults(res.data);
+            } catch (error) {
+                if (!cancelled) setLookupResults(null);
+            }
+        }, 150);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchTerm, activeTab, selectedEvent?.id]);
+
+    const upsertVisitor = (visitor) => {
+        setVisitors(prev => prev.some(v => v.id === visitor.id)
+            ? prev.map(v => (v.id === visitor.id ? visitor : v))
+            : [...prev, visitor]);
+    };
+
+    const applyLiveChange = (change) => {
+        if (change.type === 'attendance') {
+            setAttendanceMap(prev => {
+                const next = { ...prev };
+                if (change.status) next[change.member] = change.status;
+                else delete next[change.member];
+                return next;
+            });
+        } else if (change.type === 'visitor') {
+            if (change.deleted) setVisitors(prev => prev.filter(v => v.id !== change.visitor.id));
+            else upsertVisitor(change.visitor);
+        }
+    };
+
     const fetchInitialData = async () => {
         setLoading(true);
         try {
-            const [eventsRes, membersRes] = await Promise.all([
+            const [eventsRes, memberRows] = await Promise.all([
                 api.get('events/'),
-                api.get('members/')
+                fetchAll('members/?page_size=500&fields=id,full_name,member_id')
             ]);
-            setEvents(eventsRes.data);
-            setMembers(membersRes.data);
+            setEvents(eventsRes.data.results);
+            setMembers(memberRows);
         } catch (error) {
             console.error("Error fetching attendance data", error);
         } finally {
@@ -72,17 +134,17 @@ const Attendance = () => {
 
     const fetchAttendanceAndVisitors = async (eventId) => {
         try {
-            const [attRes, visRes] = await Promise.all([
-                api.get(`attendance/?event=${eventId}`),
-                api.get(`visitors/?event=${eventId}`)
+            const [records, visitorRows] = await Promise.all([
+                fetchAll(`attendance/?event=${eventId}&page_size=500`),
+                fetchAll(`visitors/?event=${eventId}&page_size=500`)
             ]);
 
             const map = {};
-            attRes.data.forEach(record => {
+            records.forEach(record => {
                 map[record.member] = record.status;
             });
             setAttendanceMap(map);
-            setVisitors(visRes.data);
+            setVisitors(visitorRows);
         } catch (error) {
             console.error("Error fetching event details", error);
         }
@@ -119,8 +181,13 @@ const Attendance = () => {
                 member: memberId
             });
         } catch (error) {
-            console.error("Error toggling attendance", error);
-            setAttendanceMap(prev => ({ ...prev, [memberId]: currentStatus }));
+            if (error.response) {
+                console.error("Error toggling attendance", error);
+                setAttendanceMap(prev => ({ ...prev, [memberId]: currentStatus }));
+                return;
+            }
+            // Offline: keep the tick and upload it with the next flush
+            enqueue({ type: 'attendance', event: selectedEvent.id, member: memberId, status: newStatus });
         }
     };
 
@@ -131,12 +198,21 @@ const Attendance = () => {
                 ...visitorData,
                 event: selectedEvent.id
             });
-            setVisitors(prev => [...prev, res.data]);
+            upsertVisitor(res.data);
             setVisitorData({ full_name: '', phone_number: '', residence: '' });
             setIsVisitorModalOpen(false);
             setActiveTab('visitors');
         } catch (error) {
-            console.error("Error adding visitor", error);
+            if (error.response) {
+                console.error("Error adding visitor", error);
+                return;
+            }
+            // Offline: queue it and show it until the server has it
+            const queued = enqueue({ type: 'visitor', event: selectedEvent.id, ...visitorData });
+            upsertVisitor({ ...visitorData, id: queued.id, event: selectedEvent.id });
+            setVisitorData({ full_name: '', phone_number: '', residence: '' });
+            setIsVisitorModalOpen(false);
+            setActiveTab('visitors');
         }
     };
 
@@ -163,7 +239,9 @@ const Attendance = () => {
         }
     };
 
-    const filteredMembers = members.filter(m =>
+    // Server-side lookup covers every member (by name, member ID or phone digits);
+    // the loaded list is filtered locally while it answers or when offline
+    const filteredMembers = lookupResults ?? members.filter(m =>
         m.full_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
         m.member_id.toLowerCase().includes(searchTerm.toLowerCase())
     );
@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { useForm, useFieldArray } from 'react-hook-form';
-import api from '../../services/api';
+import api, { fetchAll } from '../../services/api';
 import { User, Phone, Mail, MapPin, Heart, Cross, Briefcase, Plus, Trash2, CheckCircle, Upload, Calendar, ArrowRight, Home, Users, BookOpen, ChevronLeft, ChevronRight, X } from 'lucide-react';
 import clsx from 'clsx';
 import { motion, AnimatePresence } from 'framer-motion';
@@ -90,20 +90,21 @@ const TextArea = ({ label, register, required, error, fullWidth = false, placeho
 
 const AddMemberModal = ({ isOpen, onClose, onSuccess, initialData = null }) => {
     const isEditing = !!initialData;
-    const { register, control, handleSubmit, watch, trigger, formState: { errors }, reset } = useForm({
+    const { register, control, handleSubmit, watch, trigger, setValue, formState: { errors }, reset } = useForm({
         defaultValues: { member_type: 'NEW', children: [] }
     });
     const { fields, append, remove } = useFieldArray({ control, name: "children" });
     const [step, setStep] = useState(1);
     const [submitting, setSubmitting] = useState(false);
     const [ministryOptions, setMinistryOptions] = useState([]);
+    // Earlier visits under the phone number being registered
+    const [visitorProfile, setVisitorProfile] = useState(null);
 
     // Fetch ministries for dropdown
     React.useEffect(() => {
         const fetchMinistries = async () => {
             try {
-                const res = await api.get('ministries/');
-                setMinistryOptions(res.data);
+                setMinistryOptions(await fetchAll('ministries/?page_size=500'));
             } catch (error) {
                 console.error("Error fetching ministries", error);
             }
@@ -131,6 +132,7 @@ const AddMemberModal = ({ isOpen, onClose, onSuccess, initialData = null }) => {
             } else {
                 reset({ member_type: 'NEW', children: [] });
             }
+            setVisitorProfile(null);
             setStep(1);
         }
     }, [isOpen, initialData, reset]);
@@ -157,6 +159,25 @@ const AddMemberModal = ({ isOpen, onClose, onSuccess, initialData = null }) => {
 
     const prevStep = () => setStep(Math.max(step - 1, 1));
 
+    const lookupVisitor = async (e) => {
+        const phone = e.target.value.trim();
+        if (isEditing || phone.replace(/\D/g, '').length < 9) {
+            setVisitorProfile(null);
+            return;
+        }
+        try {
+            const res = await api.get('visitor-profiles/lookup/', { params: { phone } });
+            setVisitorProfile(res.data.member ? null : res.data);
+        } catch (error) {
+            setVisitorProfile(null);
+        }
+    };
+
+    const applyVisitorDetails = () => {
+        setValue('full_name', visitorProfile.full_name);
+        if (visitorProfile.residence) setValue('estate', visitorProfile.residence);
+    };
+
     const onSubmit = async (data) => {
         setSubmitting(true);
         try {
@@ -209,6 +230,10 @@ const AddMemberModal = ({ isOpen, onClose, onSuccess, initialData = null }) => {
             if (isEditing) {
                 // For edit, use PATCH or PUT
                 res = await api.patch(`members/${initialData.id}/`, jsonData);
+            } else if (visitorProfile) {
+                // Registers the member and links their earlier visits in one go
+                const converted = await api.post(`visitor-profiles/${visitorProfile.id}/convert/`, jsonData);
+                res = { data: converted.data.member };
             } else {
                 res = await api.post('members/', jsonData);
             }
@@ -305,7 +330,17 @@ const AddMemberModal = ({ isOpen, onClose, onSuccess, initialData = null }) => {
                                 <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
                                     <Input label="Full Name" register={register("full_name", { required: "Full name is required" })} required error={errors.full_name} icon={User} />
                                     <Input label="Also Known As" register={register("also_known_as")} icon={User} />
-                                    <Input label="Phone Number" register={register("phone", { required: "Phone is required" })} required error={errors.phone} icon={Phone} />
+                                    <Input label="Phone Number" register={register("phone", { required: "Phone is required", onBlur: lookupVisitor })} required error={errors.phone} icon={Phone} />
+                                    {visitorProfile && (
+                                        <div className="md:col-span-2 flex items-center justify-between gap-4 p-3 bg-blue-50 border border-blue-100 rounded-xl text-sm text-blue-800">
+                                            <span>
+                                                <strong>{visitorProfile.full_name}</strong> has visited {visitorProfile.visit_count} {visitorProfile.visit_count === 1 ? 'time' : 'times'} since {new Date(visitorProfile.first_seen).toLocaleDateString()}. Their visits will be linked to this member.
+                                            </span>
+                                            <button type="button" onClick={applyVisitorDetails} className="shrink-0 text-xs bg-white border border-blue-200 text-blue-600 px-3 py-1.5 rounded-lg font-medium hover:bg-blue-100">
+                                                Use visitor details
+                                            </button>
+                                        </div>
+                                    )}
                                     <Input label="Email Address" type="email" register={register("email")} icon={Mail} />
                                     <Input label="Date of Birth" type="date" register={register("dob")} icon={Calendar} />
                                     <Input label="National ID Number" register={register("national_id")} icon={User} />
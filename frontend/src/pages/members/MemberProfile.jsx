@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import api from '../../services/api';
+import api, { fetchAll } from '../../services/api';
 import {
     User, Phone, Mail, MapPin, Calendar, Heart, Cross,
     Briefcase, ArrowLeft, Edit, Printer, Loader,
@@ -35,8 +35,7 @@ const MemberProfile = () => {
 
     const fetchMinistries = async () => {
         try {
-            const response = await api.get('ministries/');
-            setMinistries(response.data);
+            setMinistries(await fetchAll('ministries/?page_size=500'));
         } catch (error) {
             console.error("Error fetching ministries:", error);
         }
@@ -157,7 +156,7 @@ const MemberProfile = () => {
                             <div className="relative inline-block -mt-12 mb-4">
                                 {member.passport_photo ? (
                                     <img
-                                        src={member.passport_photo}
+                                        src={member.photo_variants?.medium.webp || member.passport_photo}
                                         alt={member.full_name}
                                         className="w-24 h-24 rounded-2xl object-cover border-4 border-white shadow-lg transition-transform duration-500 group-hover:scale-105"
                                     />
@@ -8,7 +8,6 @@ import AddMemberModal from './AddMemberModal';
 
 const MembersList = () => {
     const [members, setMembers] = useState([]);
-    const [filteredMembers, setFilteredMembers] = useState([]);
     const [loading, setLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
     const [filterType, setFilterType] = useState('ALL'); // ALL, NEW, OLD
@@ -17,37 +16,26 @@ const MembersList = () => {
     const [memberToDelete, setMemberToDelete] = useState(null);
     const [deleting, setDeleting] = useState(false);
     const [activeMenuId, setActiveMenuId] = useState(null);
+    const [totalMembers, setTotalMembers] = useState(0);
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
+    // Search and type filters run on the server, over every member rather
+    // than just the pages loaded so far
     useEffect(() => {
-        fetchMembers();
-    }, []);
-
-    useEffect(() => {
-        let result = members;
-
-        // Search Filter
-        if (searchTerm) {
-            const lowerTerm = searchTerm.toLowerCase();
-            result = result.filter(member =>
-                member.full_name.toLowerCase().includes(lowerTerm) ||
-                member.member_id.toLowerCase().includes(lowerTerm) ||
-                member.phone.includes(searchTerm)
-            );
-        }
-
-        // Type Filter
-        if (filterType !== 'ALL') {
-            result = result.filter(member => member.member_type === filterType);
-        }
-
-        setFilteredMembers(result);
-    }, [searchTerm, filterType, members]);
+        const timer = setTimeout(fetchMembers, searchTerm ? 250 : 0);
+        return () => clearTimeout(timer);
+    }, [searchTerm, filterType]);
 
     const fetchMembers = async () => {
+        const params = { count: true };
+        if (searchTerm.trim()) params.search = searchTerm.trim();
+        if (filterType !== 'ALL') params.member_type = filterType;
         try {
-            const response = await api.get('members/');
-            setMembers(response.data);
-            setFilteredMembers(response.data);
+            const response = await api.get('members/', { params });
+            setMembers(response.data.results);
+            setTotalMembers(response.data.count);
+            setNextPage(response.data.next);
         } catch (error) {
             console.error("Error fetching members:", error);
         } finally {
@@ -55,12 +43,27 @@ const MembersList = () => {
         }
     };
 
+    const loadMoreMembers = async () => {
+        if (!nextPage) return;
+        setLoadingMore(true);
+        try {
+            const response = await api.get(nextPage);
+            setMembers(prev => [...prev, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (error) {
+            console.error("Error loading more members:", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDeleteMember = async () => {
         if (!memberToDelete) return;
         setDeleting(true);
         try {
             await api.delete(`members/${memberToDelete.id}/`);
             setMembers(prev => prev.filter(m => m.id !== memberToDelete.id));
+            setTotalMembers(prev => prev - 1);
             setMemberToDelete(null);
         } catch (error) {
             console.error("Error deleting member:", error);
@@ -86,7 +89,7 @@ const MembersList = () => {
             <div className="flex flex-col items-center text-center md:flex-row md:items-end md:text-left justify-between gap-6">
                 <div>
                     <h1 className="text-3xl font-bold text-gray-900 tracking-tight">Members Directory</h1>
-                    <p className="text-gray-500 mt-1.5 text-base">Manage, track, and connect with your church community.</p>
+                    <p className="text-gray-500 mt-1.5 text-base">Manage, track, and connect with your church community{totalMembers > 0 && ` · ${totalMembers} members`}.</p>
                 </div>
                 <button
                     onClick={() => setIsAddModalOpen(true)}
@@ -146,7 +149,7 @@ const MembersList = () => {
             </div>
 
             {/* Results */}
-            {filteredMembers.length === 0 ? (
+            {members.length === 0 ? (
                 <div className="text-center py-20 bg-white rounded-3xl border border-dashed border-gray-200">
                     <div className="bg-gray-50 w-20 h-20 rounded-full flex items-center justify-center mx-auto mb-6">
                         <User size={32} className="text-gray-300" />
@@ -165,7 +168,7 @@ const MembersList = () => {
             ) : (
                 <div className={viewMode === 'grid' ? "grid grid-cols-1 md:grid-cols-2 xl:grid-cols-3 gap-4" : "space-y-3"}>
                     <AnimatePresence mode="popLayout">
-                        {filteredMembers.map((member) => (
+                        {members.map((member) => (
                             <motion.div
                                 key={member.id}
                                 layout
@@ -190,7 +193,7 @@ const MembersList = () => {
                                         <div className="relative">
                                             {member.passport_photo ? (
                                                 <img
-                                                    src={member.passport_photo}
+                                                    src={member.photo_variants?.thumb.webp || member.passport_photo}
                                                     alt={member.full_name}
                                                     className={clsx(
                                                         "rounded-2xl object-cover shadow-sm ring-4 ring-white transition-transform duration-500 group-hover:scale-105",
@@ -322,6 +325,18 @@ const MembersList = () => {
                 </div>
             )}
 
+            {nextPage && (
+                <div className="flex justify-center">
+                    <button
+                        onClick={loadMoreMembers}
+                        disabled={loadingMore}
+                        className="px-6 py-2.5 bg-white border border-gray-200 rounded-xl text-sm font-bold text-gray-700 hover:bg-gray-50 transition disabled:opacity-50"
+                    >
+                        {loadingMore ? 'Loading...' : `Load more (${members.length} of ${totalMembers})`}
+                    </button>
+                </div>
+            )}
+
             <AddMemberModal
                 isOpen={isAddModalOpen}
                 onClose={() => setIsAddModalOpen(false)}
@@ -15,7 +15,7 @@ const AddMinistryModal = ({ isOpen, onClose, onRefresh }) => {
             const fetchUsers = async () => {
                 try {
                     const res = await api.get('accounts/users/'); // Assuming this endpoint exists
-                    setUsers(res.data);
+                    setUsers(res.data.results);
                 } catch (error) {
                     console.error("Error fetching users", error);
                 }
@@ -28,7 +28,7 @@ const Ministries = () => {
         setLoading(true);
         try {
             const res = await api.get('ministries/');
-            setMinistries(res.data);
+            setMinistries(res.data.results);
         } catch (error) {
             console.error("Error fetching ministries", error);
         } finally {
@@ -45,4 +45,19 @@ api.interceptors.response.use(
     }
 );
 
+// Every row of a paginated list endpoint, following `next` until it runs out
+export const fetchAll = async (url, config) => {
+    const results = [];
+    let next = url;
+    let options = config;
+    while (next) {
+        const response = await api.get(next, options);
+        results.push(...response.data.results);
+        next = response.data.next;
+        // `next` already carries the query string
+        options = undefined;
+    }
+    return results;
+};
+
 export default api;
@@ -0,0 +1,52 @@
+// Server-Sent Events over fetch, so the API's Authorization header can be sent
+// (EventSource can't set headers). Reconnects until the returned stop() is called.
+export const subscribeToEvent = (eventId, handlers) => {
+    const controller = new AbortController();
+    let stopped = false;
+
+    const dispatch = (block) => {
+        let name = 'message';
+        let data = '';
+        block.split('\n').forEach((line) => {
+            if (line.startsWith('event: ')) name = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        if (data && handlers[name]) handlers[name](JSON.parse(data));
+    };
+
+    const connect = async () => {
+        while (!stopped) {
+            try {
+                const res = await fetch(`/api/v1/events/${eventId}/live/`, {
+                    headers: { Authorization: `Bearer ${localStorage.getItem('access_token')}` },
+                    signal: controller.signal,
+                });
+                // Not served (e.g. a WSGI deployment) or not authorized: stay on plain REST
+                if (!res.ok || !res.body) return;
+
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let index;
+                    while ((index = buffer.indexOf('\n\n')) !== -1) {
+                        dispatch(buffer.slice(0, index));
+                        buffer = buffer.slice(index + 2);
+                    }
+                }
+            } catch (error) {
+                if (stopped) return;
+            }
+            await new Promise((resolve) => setTimeout(resolve, 3000));
+        }
+    };
+
+    connect();
+    return () => {
+        stopped = true;
+        controller.abort();
+    };
+};
@@ -0,0 +1,52 @@
+import api from './api';
+
+// Check-ins that couldn't reach the server, kept across reloads and uploaded
+// in one batch to sync/checkins/ when the connection comes back.
+const STORAGE_KEY = 'checkin_queue';
+const DEVICE_KEY = 'checkin_device';
+
+const load = () => JSON.parse(localStorage.getItem(STORAGE_KEY) || '[]');
+const save = (operations) => localStorage.setItem(STORAGE_KEY, JSON.stringify(operations));
+
+const newId = () => (window.crypto?.randomUUID ? window.crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+
+const deviceId = () => {
+    let device = localStorage.getItem(DEVICE_KEY);
+    if (!device) {
+        device = newId();
+        localStorage.setItem(DEVICE_KEY, device);
+    }
+    return device;
+};
+
+export const pendingCount = () => load().length;
+
+export const enqueue = (operation) => {
+    const queued = { id: newId(), timestamp: new Date().toISOString(), ...operation };
+    save([...load(), queued]);
+    return queued;
+};
+
+let flushing = null;
+
+export const flush = () => {
+    if (flushing) return flushing;
+    const operations = load();
+    if (!operations.length) return Promise.resolve([]);
+
+    flushing = api.post('sync/checkins/', { device: deviceId(), operations })
+        .then((res) => {
+            // Every operation got an answer (applied, stale, duplicate or rejected)
+            const answered = new Set(res.data.results.map((result) => result.id));
+            save(load().filter((operation) => !answered.has(operation.id)));
+            return res.data.results;
+        })
+        .finally(() => {
+            flushing = null;
+        });
+    return flushing;
+};
+
+window.addEventListener('online', () => {
+    flush().catch(() => {});
+});
@@ -0,0 +1,187 @@
+import heapq
+from collections import namedtuple
+from difflib import SequenceMatcher
+from itertools import combinations, groupby
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from attendance import rollup
+from attendance.models import Attendance, Visitor
+from core.utils import name_key, name_tokens, normalize_phone
+from .models import Member
+
+MATCH_THRESHOLD = 0.6
+# Very common phonetic codes make huge blocks; past this size a block is
+# too generic to say anything, so it is skipped rather than compared pairwise
+MAX_BLOCK_SIZE = 200
+BLOCKING_KEYS = ('national_id', 'phone_key', 'name_key')
+# Never copied from a merged duplicate onto the surviving member
+MERGE_SKIP_FIELDS = ('id', 'member_id', 'phone', 'created_at', 'updated_at')
+
+Record = namedtuple('Record', 'kind id name phone_key name_key national_id detail')
+
+
+def _member_records(queryset):
+    for pk, name, phone_key, key, national_id, member_id in queryset.values_list(
+        'id', 'full_name', 'phone_key', 'name_key', 'national_id', 'member_id'
+    ).iterator(chunk_size=2000):
+        yield Record('member', pk, name, phone_key, key, national_id, member_id)
+
+
+def _visitor_records(queryset):
+    for pk, name, phone_key, key, phone in queryset.values_list(
+        'id', 'full_name', 'phone_key', 'name_key', 'phone_number'
+    ).iterator(chunk_size=2000):
+        yield Record('visitor', pk, name, phone_key, key, None, phone)
+
+
+def _sorted_name(name):
+    return ' '.join(sorted(name_tokens(name)))
+
+
+def score(a, b):
+    """Likelihood (0-1) that two records are the same person, with the reasons."""
+    total, reasons = 0.0, []
+    if a.national_id and a.national_id == b.national_id:
+        total += 0.6
+        reasons.append('national_id')
+    if a.phone_key and a.phone_key == b.phone_key:
+        total += 0.5
+        reasons.append('phone')
+    similarity = SequenceMatcher(None, _sorted_name(a.name), _sorted_name(b.name)).ratio()
+    total += 0.5 * similarity
+    if similarity >= 0.85:
+        reasons.append('name')
+    elif a.name_key and a.name_key == b.name_key:
+        reasons.append('name_sounds_alike')
+    return round(min(total, 1.0), 3), reasons
+
+
+def find_candidates(full_name='', phone='', national_id='', exclude_member=None, limit=10, members=None, visitors=None):
+    """
+    Members and visitors that may be the person being registered, out of
+    the `members` and `visitors` querysets (everyone by default).
+
+    Only rows sharing a blocking key are fetched (one indexed query per
+    table), then scored in Python.
+    """
+    probe = Record('probe', None, full_name, normalize_phone(phone), name_key(full_name), national_id or None, '')
+    lookup = Q()
+    for field in BLOCKING_KEYS:
+        value = getattr(probe, field)
+        if value:
+            lookup |= Q(**{field: value})
+    if not lookup:
+        return []
+
+    members = (Member.objects.all() if members is None else members).filter(lookup)
+    if visitors is None:
+        visitors = Visitor.objects.all()
+    if exclude_member is not None:
+        members = members.exclude(pk=exclude_member)
+    visitor_lookup = Q(phone_key=probe.phone_key) if probe.phone_key else Q()
+    if probe.name_key:
+        visitor_lookup |= Q(name_key=probe.name_key)
+
+    records = list(_member_records(members[:MAX_BLOCK_SIZE]))
+    if visitor_lookup:
+        records += _visitor_records(visitors.filter(visitor_lookup).order_by('-created_at')[:MAX_BLOCK_SIZE])
+
+    results = []
+    for record in records:
+        value, reasons = score(probe, record)
+        if value >= MATCH_THRESHOLD:
+            results.append(_as_dict(record, value, reasons))
+    results.sort(key=lambda result: result['score'], reverse=True)
+    return results[:limit]
+
+
+def _as_dict(record, value, reasons):
+    return {
+        'type': record.kind,
+        'id': record.id,
+        'full_name': record.name,
+        'detail': record.detail,
+        'score': value,
+        'reasons': reasons,
+    }
+
+
+def _blocks(field):
+    members = _member_records(Member.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).order_by(field))
+    streams = [members]
+    if field != 'national_id':
+        streams.append(_visitor_records(Visitor.objects.exclude(**{field: ''}).order_by(field)))
+    # Both streams are ordered by the key, so a merge yields one block at a time
+    merged = heapq.merge(*streams, key=lambda record: getattr(record, field))
+    for _, block in groupby(merged, key=lambda record: getattr(record, field)):
+        yield list(block)
+
+
+def scan(threshold=MATCH_THRESHOLD):
+    """
+    Yield (score, reasons, a, b) for likely duplicate pairs in the database.
+
+    Rows are streamed sorted by each blocking key and only compared within
+    their block, so the cost is close to linear in the number of rows.
+    Member/member and visitor/member pairs are reported; repeat visits by
+    the same visitor are not duplicates.
+    """
+    seen = set()
+    for field in BLOCKING_KEYS:
+        for block in _blocks(field):
+            if len(block) < 2 or len(block) > MAX_BLOCK_SIZE:
+                continue
+            for a, b in combinations(block, 2):
+                if a.kind == 'visitor' and b.kind == 'visitor':
+                    continue
+                pair = tuple(sorted(((a.kind, a.id), (b.kind, b.id))))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                value, reasons = score(a, b)
+                if value >= threshold:
+                    yield value, reasons, a, b
+
+
+@transaction.atomic
+def merge_members(primary, duplicate):
+    """
+    Fold `duplicate` into `primary` and delete it.
+
+    Attendances, children, visits and visitor profiles are re-pointed with
+    one UPDATE each. Where both
+    records attended the same event the surviving row is PRESENT if either
+    was. Blank fields on `primary` are filled from `duplicate`.
+    """
+    # Before the raw rows move: the UPDATEs below don't reach the bitsets
+    rollup.merge(primary.pk, duplicate.pk)
+    primary_events = Attendance.objects.filter(member=primary).values('event_id')
+    clashing = Attendance.objects.filter(member=duplicate, event_id__in=primary_events)
+    Attendance.objects.filter(
+        member=primary,
+        event_id__in=clashing.filter(status='PRESENT').values('event_id'),
+    ).update(status='PRESENT')
+    clashing.delete()
+    attendances = Attendance.objects.filter(member=duplicate).update(member=primary)
+    children = duplicate.children.update(member=primary)
+    # Otherwise SET_NULL on delete would unlink the visitor they converted from
+    visits = duplicate.visits.update(member=primary, updated_at=timezone.now())
+    duplicate.visitor_profiles.update(member=primary, updated_at=timezone.now())
+
+    filled = []
+    for field in Member._meta.concrete_fields:
+        if not field.editable or field.name in MERGE_SKIP_FIELDS:
+            continue
+        if not getattr(primary, field.attname) and getattr(duplicate, field.attname):
+            setattr(primary, field.attname, getattr(duplicate, field.attname))
+            filled.append(field.name)
+    if 'passport_photo' in filled:
+        primary.photo_hash = duplicate.photo_hash
+
+    # Delete first: unique fields like national_id may move to the primary
+    duplicate.delete()
+    primary.save()
+    return {'attendances': attendances, 'children': children, 'visits': visits, 'fields': filled}
@@ -0,0 +1,254 @@
+import csv
+import datetime
+import io
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from ministries.models import Ministry
+from search.index import index_objects
+from stats.counters import apply, member_counts, track_members
+from sync.tombstones import track_scope_exits
+from .models import Child, Member, MemberIdSequence
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class MemberImportSerializer(serializers.ModelSerializer):
+    # Ministries are given by name (or id) and resolved from a preloaded map
+    main_ministry = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = Member
+        exclude = ('id', 'member_id', 'passport_photo', 'created_at', 'updated_at')
+        # Uniqueness is checked once per chunk instead of once per row
+        extra_kwargs = {
+            'phone': {'validators': []},
+            'national_id': {'validators': []},
+        }
+
+
+def iter_rows(file, filename):
+    """Yield one dict per data row of a CSV or XLSX upload without loading it whole."""
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        return _iter_xlsx(file)
+    if name.endswith('.csv') or not name:
+        return _iter_csv(file)
+    raise ImportFileError('Unsupported file type, upload a .csv or .xlsx file')
+
+
+def _normalize_header(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _clean(row):
+    cleaned = {}
+    for key, value in row.items():
+        if not key or value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            value = value.date()
+        elif not isinstance(value, datetime.date):
+            value = str(value).strip()
+            if value == '':
+                continue
+        cleaned[key] = value
+    return cleaned
+
+
+def _iter_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    headers = [_normalize_header(h) for h in next(reader, [])]
+    for values in reader:
+        yield _clean(dict(zip(headers, values)))
+
+
+def _iter_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX import needs openpyxl, upload a .csv file instead')
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(rows, ())]
+        for values in rows:
+            if not any(v is not None for v in values):
+                continue
+            yield _clean(dict(zip(headers, values)))
+    finally:
+        workbook.close()
+
+
+class MemberImporter:
+    """
+    Validate and write member rows in chunks of `batch_size`.
+
+    Each chunk costs a handful of queries (existing-member lookup, id block
+    reservation, bulk insert/update of members and children) regardless of
+    its size. With `upsert`, rows matching an existing member by national_id
+    or phone update that member; otherwise they are reported as errors.
+    """
+
+    def __init__(self, dry_run=False, upsert=False, batch_size=500):
+        self.dry_run = dry_run
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.ministries = None
+        self.seen = set()
+        self.report = {
+            'dry_run': dry_run,
+            'rows': 0,
+            'created': 0,
+            'updated': 0,
+            'failed': 0,
+            'errors': [],
+        }
+
+    def run(self, rows):
+        # Row numbers match the spreadsheet, the header being row 1
+        numbered = enumerate(rows, start=2)
+        while True:
+            chunk = list(islice(numbered, self.batch_size))
+            if not chunk:
+                break
+            self.report['rows'] += len(chunk)
+            self._process(chunk)
+        return self.report
+
+    def _error(self, line, errors):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'row': line, 'errors': errors})
+        else:
+            self.report['errors_truncated'] = True
+
+    def _resolve_ministry(self, value):
+        if self.ministries is None:
+            self.ministries = {}
+            for pk, name in Ministry.objects.values_list('id', 'name'):
+                self.ministries[str(pk)] = pk
+                self.ministries[name.strip().lower()] = pk
+        return self.ministries.get(value.strip().lower())
+
+    def _validate(self, chunk):
+        valid = []
+        for line, row in chunk:
+            children = [name.strip() for name in str(row.pop('children', '')).split(';') if name.strip()]
+            serializer = MemberImportSerializer(data=row)
+            if not serializer.is_valid():
+                self._error(line, serializer.errors)
+                continue
+            data = dict(serializer.validated_data)
+
+            ministry = data.pop('main_ministry', '')
+            if ministry:
+                ministry_id = self._resolve_ministry(ministry)
+                if ministry_id is None:
+                    self._error(line, {'main_ministry': [f'Unknown ministry "{ministry}".']})
+                    continue
+                data['main_ministry_id'] = ministry_id
+
+            keys = {('phone', data['phone'])}
+            if data.get('national_id'):
+                keys.add(('national_id', data['national_id']))
+            if keys & self.seen:
+                self._error(line, {'non_field_errors': ['Duplicate of an earlier row in this file.']})
+                continue
+            self.seen.update(keys)
+            valid.append((line, data, children))
+        return valid
+
+    def _existing(self, valid):
+        phones = [data['phone'] for _, data, _ in valid]
+        national_ids = [data['national_id'] for _, data, _ in valid if data.get('national_id')]
+        existing = {}
+        for member in Member.objects.filter(Q(phone__in=phones) | Q(national_id__in=national_ids)):
+            existing[('phone', member.phone)] = member
+            if member.national_id:
+                existing[('national_id', member.national_id)] = member
+        return existing
+
+    def _process(self, chunk):
+        valid = self._validate(chunk)
+        if not valid:
+            return
+        existing = self._existing(valid)
+
+        to_create, to_update, update_fields, lines = [], [], set(), []
+        for line, data, children in valid:
+            match = existing.get(('national_id', data.get('national_id'))) or existing.get(('phone', data['phone']))
+            if match is None:
+                to_create.append((Member(**data), children))
+                lines.append(line)
+            elif not self.upsert:
+                self._error(line, {'non_field_errors': [f'Member {match.member_id} already has this phone or national ID.']})
+            else:
+                for field, value in data.items():
+                    setattr(match, field, value)
+                update_fields.update(data)
+                to_update.append((match, children))
+                lines.append(line)
+
+        if self.dry_run:
+            self.report['created'] += len(to_create)
+            self.report['updated'] += len(to_update)
+            return
+
+        try:
+            with transaction.atomic():
+                self._write(to_create, to_update, update_fields)
+        except IntegrityError as exc:
+            for line in lines:
+                self._error(line, {'non_field_errors': [f'Chunk rolled back: {exc}']})
+            return
+        self.report['created'] += len(to_create)
+        self.report['updated'] += len(to_update)
+
+    def _write(self, to_create, to_update, update_fields):
+        members = [member for member, _ in to_create]
+        for member, member_id in zip(members, MemberIdSequence.reserve(len(members))):
+            member.member_id = member_id
+            member.update_dedup_keys()
+        Member.objects.bulk_create(members)
+
+        if to_update:
+            now = timezone.now()
+            for member, _ in to_update:
+                member.updated_at = now
+                member.update_dedup_keys()
+            ids = [member.pk for member, _ in to_update]
+            with track_members(ids), track_scope_exits(ids):
+                Member.objects.bulk_update(
+                    [member for member, _ in to_update],
+                    sorted(update_fields | {'updated_at', 'phone_key', 'name_key'}),
+                )
+
+        # Only add children the member doesn't already have
+        known = set()
+        if to_update:
+            known = set(
+                Child.objects.filter(member__in=[member for member, _ in to_update])
+                .values_list('member_id', 'full_name')
+            )
+        Child.objects.bulk_create(
+            Child(member=member, full_name=name)
+            for member, names in to_create + to_update
+            for name in names
+            if (member.pk, name) not in known
+        )
+
+        # bulk_create/bulk_update bypass the signals that keep search and the
+        # dashboard counters in sync
+        index_objects(members + [member for member, _ in to_update])
+        if members:
+            apply(member_counts(Member.objects.filter(pk__in=[member.pk for member in members])))
@@ -0,0 +1,27 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from members.dedup import MATCH_THRESHOLD, scan
+
+
+class Command(BaseCommand):
+    help = 'Scan members and visitors for likely duplicates and write them as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD)
+        parser.add_argument('--output', help='CSV file to write (defaults to stdout)')
+
+    def handle(self, *args, **options):
+        file = open(options['output'], 'w', newline='') if options['output'] else self.stdout
+        try:
+            writer = csv.writer(file)
+            writer.writerow(['score', 'reasons', 'type_a', 'id_a', 'name_a', 'detail_a', 'type_b', 'id_b', 'name_b', 'detail_b'])
+            count = 0
+            for value, reasons, a, b in scan(options['threshold']):
+                writer.writerow([value, ';'.join(reasons), a.kind, a.id, a.name, a.detail, b.kind, b.id, b.name, b.detail])
+                count += 1
+        finally:
+            if options['output']:
+                file.close()
+        self.stderr.write(f"{count} possible duplicate pairs")
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members.importer import ImportFileError, MemberImporter, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Import members from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+        parser.add_argument('--upsert', action='store_true', help='Update members matched by national_id or phone')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        importer = MemberImporter(
+            dry_run=options['dry_run'],
+            upsert=options['upsert'],
+            batch_size=options['batch_size'],
+        )
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(iter_rows(file, options['path']))
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        summary = f"{report['rows']} rows: {report['created']} created, {report['updated']} updated, {report['failed']} failed"
+        if report['dry_run']:
+            summary += ' (dry run)'
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from members.models import Member
+from members.photos import process_stored_photo
+
+
+class Command(BaseCommand):
+    help = 'Run existing passport photos through the image pipeline (EXIF strip, variants, content hash)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--delete-originals', action='store_true', help='Remove the unprocessed uploads afterwards')
+
+    def handle(self, *args, **options):
+        pending = (
+            Member.objects.filter(photo_hash__isnull=True)
+            .exclude(passport_photo='')
+            .exclude(passport_photo__isnull=True)
+        )
+        # Several members can share one uploaded file
+        names = {}
+        for name, member_id in pending.values_list('passport_photo', 'id'):
+            names.setdefault(name, []).append(member_id)
+        if not names:
+            self.stdout.write('No photos to process')
+            return
+
+        # Workers only touch storage; don't let them inherit open DB connections
+        connections.close_all()
+        processed, failed, updated, updates = 0, 0, 0, []
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {name: pool.submit(process_stored_photo, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    old_name, new_name, photo_hash = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+                    continue
+                processed += 1
+                # bulk_update skips auto_now: set updated_at so ETags and sync see the change
+                now = timezone.now()
+                updates += [
+                    Member(id=member_id, passport_photo=new_name, photo_hash=photo_hash, updated_at=now)
+                    for member_id in names[old_name]
+                ]
+                if options['delete_originals'] and old_name != new_name:
+                    default_storage.delete(old_name)
+                if len(updates) >= options['batch_size']:
+                    updated += self._flush(updates)
+
+        updated += self._flush(updates)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} photos for {updated} members, {failed} failed"))
+
+    def _flush(self, updates):
+        count = len(updates)
+        Member.objects.bulk_update(updates, ['passport_photo', 'photo_hash', 'updated_at'])
+        updates.clear()
+        return count
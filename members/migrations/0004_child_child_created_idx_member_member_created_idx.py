@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0003_member_national_id'),
+        ('ministries', '0002_ministry_ministry_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['created_at', 'id'], name='child_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['created_at', 'id'], name='member_created_idx'),
+        ),
+    ]
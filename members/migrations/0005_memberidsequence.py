@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_child_child_created_idx_member_member_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberIdSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
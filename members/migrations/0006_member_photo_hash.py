@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0005_memberidsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='photo_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:59
+
+from django.db import migrations, models
+
+from core.utils import name_key, normalize_phone
+
+
+def fill_dedup_keys(apps, schema_editor):
+    Member = apps.get_model('members', 'Member')
+    batch = []
+    for obj in Member.objects.only('id', 'full_name', 'phone').iterator(chunk_size=2000):
+        obj.phone_key = normalize_phone(obj.phone)
+        obj.name_key = name_key(obj.full_name)
+        batch.append(obj)
+        if len(batch) >= 2000:
+            Member.objects.bulk_update(batch, ['phone_key', 'name_key'])
+            batch = []
+    Member.objects.bulk_update(batch, ['phone_key', 'name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0006_member_photo_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='phone_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_dedup_keys, migrations.RunPython.noop),
+    ]
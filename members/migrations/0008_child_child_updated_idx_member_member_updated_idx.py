@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0007_member_name_key_member_phone_key'),
+        ('ministries', '0003_ministry_ministry_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['updated_at', 'id'], name='child_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['updated_at', 'id'], name='member_updated_idx'),
+        ),
+    ]
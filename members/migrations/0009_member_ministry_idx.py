@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0008_child_child_updated_idx_member_member_updated_idx'),
+        ('ministries', '0003_ministry_ministry_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['main_ministry', 'created_at', 'id'], name='member_ministry_idx'),
+        ),
+    ]
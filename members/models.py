@@ -1,7 +1,62 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
 from core.models import TimeStampedModel
+from core.utils import name_key, normalize_phone
 from ministries.models import Ministry
 
+
+class MemberIdSequence(models.Model):
+    """
+    Per-year counter behind the COCYYYYnnnn member ids.
+
+    Ids are handed out with a single `UPDATE ... SET last_value = last_value + n`
+    which locks the year's row until the transaction commits, so concurrent
+    registrations never see the same number.
+    """
+    PREFIX = 'COC'
+
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+
+    @classmethod
+    def format(cls, year, number):
+        return f"{cls.PREFIX}{year}{number:04d}"
+
+    @classmethod
+    def reserve(cls, count=1, year=None):
+        """Atomically reserve `count` consecutive member ids and return them."""
+        year = year or timezone.localdate().year
+        with transaction.atomic():
+            cls.objects.get_or_create(year=year, defaults={'last_value': cls._highest_issued(year)})
+            cls.objects.filter(year=year).update(last_value=F('last_value') + count)
+            last = cls.objects.values_list('last_value', flat=True).get(year=year)
+        return [cls.format(year, number) for number in range(last - count + 1, last + 1)]
+
+    @classmethod
+    def next_member_id(cls, year=None):
+        return cls.reserve(1, year)[0]
+
+    @classmethod
+    def _highest_issued(cls, year):
+        # Seed a new year from ids already issued (imports, pre-sequence rows)
+        prefix = f"{cls.PREFIX}{year}"
+        last_id = (
+            Member.objects.filter(member_id__startswith=prefix)
+            .order_by(Length('member_id').desc(), '-member_id')
+            .values_list('member_id', flat=True)
+            .first()
+        )
+        try:
+            return int(last_id[len(prefix):])
+        except (TypeError, ValueError):
+            return 0
+
+
 class Member(TimeStampedModel):
     MARITAL_STATUS_CHOICES = [
         ('SINGLE', 'Single'),
@@ -29,6 +84,7 @@ class Member(TimeStampedModel):
     full_name = models.CharField(max_length=255)
     also_known_as = models.CharField(max_length=255, blank=True, null=True)
     passport_photo = models.ImageField(upload_to='members/photos/', blank=True, null=True)
+    photo_hash = models.CharField(max_length=64, blank=True, null=True, editable=False) # Content hash, locates resized variants
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, default='MALE')
     year_of_birth = models.IntegerField(null=True, blank=True)
     other_details = models.TextField(blank=True, null=True)
@@ -37,6 +93,10 @@ class Member(TimeStampedModel):
     phone = models.CharField(max_length=20, unique=True) # Important for identification
     national_id = models.CharField(max_length=20, blank=True, null=True, unique=True) # Added for identification
     email = models.EmailField(blank=True, null=True)
+
+    # Normalized blocking keys for duplicate detection
+    phone_key = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+    name_key = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
     
     # Residence
     estate = models.CharField(max_length=100, blank=True, null=True)
@@ -93,23 +153,29 @@ class Member(TimeStampedModel):
     influence_reason = models.TextField(blank=True, null=True, help_text="What influenced you to come to this church?")
     prayer_need = models.TextField(blank=True, null=True)
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = TimeStampedModel.Meta.indexes + [
+            # Ministry rosters, paged on (created_at, id)
+            models.Index(fields=['main_ministry', 'created_at', 'id'], name='member_ministry_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.member_id:
-            # Simple ID generation logic: COC + Year + Increment
-            import datetime
-            year = datetime.date.today().year
-            last_member = Member.objects.last()
-            if last_member and last_member.member_id.startswith(f"COC{year}"):
-                try:
-                    last_id_num = int(last_member.member_id[-4:])
-                    new_id_num = last_id_num + 1
-                except ValueError:
-                    new_id_num = 1
-            else:
-                new_id_num = 1
-            self.member_id = f"COC{year}{new_id_num:04d}"
+            # COC + Year + Increment, from the per-year sequence
+            self.member_id = MemberIdSequence.next_member_id()
+        if self.passport_photo and not self.passport_photo._committed:
+            # Fresh upload: strip EXIF, build variants, store by content hash
+            from .photos import store_photo
+            self.passport_photo, self.photo_hash = store_photo(self.passport_photo)
+        elif not self.passport_photo:
+            self.photo_hash = None
+        self.update_dedup_keys()
         super().save(*args, **kwargs)
 
+    def update_dedup_keys(self):
+        self.phone_key = normalize_phone(self.phone)
+        self.name_key = name_key(self.full_name)
+
     def __str__(self):
         return f"{self.full_name} ({self.member_id})"
 
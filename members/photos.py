@@ -0,0 +1,98 @@
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+PHOTO_ROOT = 'members/photos'
+# name -> longest side in pixels
+VARIANTS = {
+    'thumb': 128,
+    'medium': 512,
+}
+ORIGINAL_MAX_SIZE = 1600
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def photo_dir(photo_hash):
+    # Two-level fan-out keeps directories small
+    return posixpath.join(PHOTO_ROOT, photo_hash[:2], photo_hash)
+
+
+def original_name(photo_hash):
+    return posixpath.join(photo_dir(photo_hash), 'original.jpg')
+
+
+def variant_name(photo_hash, variant, fmt):
+    return posixpath.join(photo_dir(photo_hash), f'{variant}.{fmt}')
+
+
+def variant_names(photo_hash):
+    names = {'original': original_name(photo_hash)}
+    for variant in VARIANTS:
+        names[variant] = {fmt: variant_name(photo_hash, variant, fmt) for fmt in FORMATS}
+    return names
+
+
+def _content_hash(file):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    # Saving without exif= drops the camera metadata (GPS, device, ...)
+    image.save(buffer, pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _save(name, content, storage):
+    if not storage.exists(name):
+        storage.save(name, content)
+
+
+def store_photo(file, storage=default_storage):
+    """
+    Process an uploaded passport photo and return (original name, content hash).
+
+    The upload is stored under its SHA-256, so uploading the same picture
+    twice reuses the files already on disk. The original is re-encoded
+    without EXIF and capped at ORIGINAL_MAX_SIZE, and every entry of
+    VARIANTS is written as WebP and JPEG.
+    """
+    photo_hash = _content_hash(file)
+    name = original_name(photo_hash)
+    if storage.exists(name):
+        return name, photo_hash
+
+    image = Image.open(file)
+    # Let the JPEG decoder downscale while decoding, far cheaper for 8 MB shots
+    image.draft('RGB', (ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    image.thumbnail((ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE), Image.LANCZOS)
+
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for fmt in FORMATS:
+            _save(variant_name(photo_hash, variant, fmt), _encode(resized, fmt), storage)
+    # Written last: its presence marks the set as complete
+    _save(name, _encode(image, 'jpeg'), storage)
+    return name, photo_hash
+
+
+def process_stored_photo(name):
+    """Process-pool entry point for the backfill: run an existing file through the pipeline."""
+    with default_storage.open(name, 'rb') as file:
+        new_name, photo_hash = store_photo(file)
+    return name, new_name, photo_hash
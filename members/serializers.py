@@ -1,5 +1,29 @@
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from .models import Member, Child
+from .photos import variant_names
+
+
+class PhotoVariantsField(serializers.ReadOnlyField):
+    """URLs of the processed passport photo: original plus per-size WebP/JPEG."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'photo_hash')
+        super().__init__(**kwargs)
+
+    def to_representation(self, photo_hash):
+        storage = Member._meta.get_field('passport_photo').storage
+        request = self.context.get('request')
+
+        def url(name):
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        names = variant_names(photo_hash)
+        return {
+            variant: url(value) if isinstance(value, str) else {fmt: url(name) for fmt, name in value.items()}
+            for variant, value in names.items()
+        }
 
 class ChildSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,9 +31,10 @@ class ChildSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('member',) 
 
-class MemberSerializer(serializers.ModelSerializer):
+class MemberSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     children = ChildSerializer(many=True, required=False)
     main_ministry_name = serializers.ReadOnlyField(source='main_ministry.name')
+    photo_variants = PhotoVariantsField()
 
     class Meta:
         model = Member
@@ -22,3 +47,64 @@ class MemberSerializer(serializers.ModelSerializer):
         for child_data in children_data:
             Child.objects.create(member=member, **child_data)
         return member
+
+class MemberListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Slim representation for list endpoints, children only with ?expand=children."""
+    children = ChildSerializer(many=True, read_only=True)
+    main_ministry_name = serializers.ReadOnlyField(source='main_ministry.name')
+    photo_variants = PhotoVariantsField()
+
+    class Meta:
+        model = Member
+        fields = (
+            'id', 'member_id', 'member_type', 'full_name', 'also_known_as',
+            'passport_photo', 'photo_variants', 'gender', 'phone', 'email', 'estate', 'county',
+            'main_ministry', 'main_ministry_name', 'saved', 'baptized',
+            'joined_date', 'created_at', 'updated_at', 'children',
+        )
+        expandable_fields = ('children',)
+
+class MemberBulkFieldsSerializer(serializers.ModelSerializer):
+    """Fields that can be filtered on and changed for many members at once."""
+
+    class Meta:
+        model = Member
+        # No unique fields here: one value can't be written to many rows
+        fields = (
+            'main_ministry', 'member_type', 'gender', 'marital_status',
+            'saved', 'saved_date', 'baptized', 'baptized_date',
+            'estate', 'phase', 'county', 'sub_county', 'ward', 'village',
+            'desired_ministry',
+        )
+
+
+class MemberBulkSelectSerializer(serializers.Serializer):
+    MAX_IDS = 5000
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_IDS)
+    filter = serializers.DictField(required=False)
+
+    def _validate_fields(self, value):
+        if not value:
+            raise serializers.ValidationError('This field may not be empty.')
+        unknown = set(value) - set(MemberBulkFieldsSerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(f"Unsupported fields: {', '.join(sorted(unknown))}.")
+        serializer = MemberBulkFieldsSerializer(data=value, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return dict(serializer.validated_data)
+
+    def validate_filter(self, value):
+        return self._validate_fields(value)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter.')
+        return attrs
+
+
+class MemberBulkUpdateSerializer(MemberBulkSelectSerializer):
+    update = serializers.DictField()
+
+    def validate_update(self, value):
+        return self._validate_fields(value)
@@ -1,3 +1,115 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+
+from attendance.models import Attendance, Event
+from core.tests import APITestCase
+from ministries.models import Ministry
+from .models import Child, Member
+
+
+def csv_upload(*lines):
+    return SimpleUploadedFile('members.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+
+class MemberImportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ministry = Ministry.objects.create(name='Youth')
+
+    def upload(self, *lines, **options):
+        data = {'file': csv_upload(*lines), **options}
+        return self.client.post(reverse('member-import-members'), data, format='multipart')
+
+    def test_creates_members_and_children(self):
+        response = self.upload(
+            'Full Name,Phone,Main Ministry,Children',
+            'Jane Doe,0700000001,youth,Ann; Ben',
+            'John Doe,0700000002,,',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 0))
+        jane = Member.objects.get(phone='0700000001')
+        self.assertEqual(jane.main_ministry, self.ministry)
+        self.assertTrue(jane.member_id)
+        self.assertEqual(sorted(jane.children.values_list('full_name', flat=True)), ['Ann', 'Ben'])
+
+    def test_existing_members_need_upsert(self):
+        Member.objects.create(full_name='Jane Doe', phone='0700000001')
+        response = self.upload('full_name,phone', 'Jane Roe,0700000001')
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertEqual(Member.objects.get(phone='0700000001').full_name, 'Jane Doe')
+
+    def test_upsert_updates_in_place(self):
+        jane = Member.objects.create(full_name='Jane Doe', phone='0700000001')
+        Child.objects.create(member=jane, full_name='Ann')
+        response = self.upload(
+            'full_name,phone,main_ministry,children',
+            f'Jane Roe,0700000001,{self.ministry.pk},Ann;Ben',
+            upsert='true',
+        )
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 1))
+        jane.refresh_from_db()
+        self.assertEqual((jane.full_name, jane.main_ministry_id), ('Jane Roe', self.ministry.pk))
+        self.assertEqual(sorted(jane.children.values_list('full_name', flat=True)), ['Ann', 'Ben'])
+        self.assertEqual(Member.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.upload('full_name,phone', 'Jane Doe,0700000001', dry_run='1')
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(Member.objects.exists())
+
+    def test_invalid_rows_are_reported(self):
+        response = self.upload(
+            'full_name,phone,main_ministry',
+            ',0700000001,',
+            'Jane Doe,0700000002,Choir',
+            'John Doe,0700000003,',
+            'Johnny Doe,0700000003,',
+        )
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 3))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3, 5])
+        self.assertEqual(list(Member.objects.values_list('full_name', flat=True)), ['John Doe'])
+
+
+class MemberMergeTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.primary = Member.objects.create(full_name='Jane Doe', phone='0700000001')
+        self.duplicate = Member.objects.create(full_name='Jane M. Doe', phone='0700000002', email='jane@example.com')
+        now = timezone.now()
+        self.shared, self.other = (
+            Event.objects.create(name='Sunday Service', date=now - datetime.timedelta(days=7)),
+            Event.objects.create(name='Sunday Service', date=now),
+        )
+        Attendance.objects.create(member=self.primary, event=self.shared, status='ABSENT')
+        Attendance.objects.create(member=self.duplicate, event=self.shared, status='PRESENT')
+        Attendance.objects.create(member=self.duplicate, event=self.other, status='PRESENT')
+        Child.objects.create(member=self.duplicate, full_name='Ann')
+
+    def merge(self, duplicate):
+        return self.client.post(reverse('member-merge', args=[self.primary.pk]), {'duplicate': duplicate}, format='json')
+
+    def test_merge_moves_records_and_deletes_the_duplicate(self):
+        response = self.merge(self.duplicate.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Member.objects.filter(pk=self.duplicate.pk).exists())
+        self.primary.refresh_from_db()
+        # Blank fields are filled from the duplicate
+        self.assertEqual(self.primary.email, 'jane@example.com')
+        self.assertEqual(
+            dict(self.primary.attendances.values_list('event_id', 'status')),
+            {self.shared.pk: 'PRESENT', self.other.pk: 'PRESENT'},
+        )
+        self.assertEqual(list(self.primary.children.values_list('full_name', flat=True)), ['Ann'])
+        self.assertEqual(response.data['member']['id'], self.primary.pk)
+
+    def test_bad_duplicate_ids(self):
+        self.assertEqual(self.merge('').status_code, 400)
+        self.assertEqual(self.merge('abc').status_code, 400)
+        self.assertEqual(self.merge(self.primary.pk).status_code, 404)
+        self.assertEqual(self.merge(self.duplicate.pk + 100).status_code, 404)
+        self.assertTrue(Member.objects.filter(pk=self.duplicate.pk).exists())
@@ -1,35 +1,220 @@
-from rest_framework import viewsets, permissions, views
+from rest_framework import viewsets, permissions, views, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
+from collections import defaultdict
 from .models import Member, Child
-from .serializers import MemberSerializer, ChildSerializer
+from .serializers import (
+    MemberSerializer, MemberListSerializer, ChildSerializer,
+    MemberBulkSelectSerializer, MemberBulkUpdateSerializer,
+)
+from .importer import ImportFileError, MemberImporter, iter_rows
+from .dedup import find_candidates, merge_members
 from ministries.models import Ministry
+from accounts.scoping import RowScopeMixin, get_scope
+from attendance.models import Visitor
+from attendance.rollup import summary as attendance_summary
+from core.exports import CHUNK_SIZE, ExportMixin, chunked
+from core.filters import DateRangeFilterBackend, FieldFilterBackend
+from core.mixins import ConditionalRequestMixin, SparseFieldsetMixin
+from search.filters import IndexedSearchFilter
+from search.index import search
+from stats.counters import COUNTED_FIELDS, EPOCH, member_counts, track_members
+from sync.tombstones import track_scope_exits
+from stats.models import StatCounter
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
-from datetime import timedelta
 
-class MemberViewSet(viewsets.ModelViewSet):
+class MemberViewSet(RowScopeMixin, ConditionalRequestMixin, SparseFieldsetMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
+    list_serializer_class = MemberListSerializer
     permission_classes = [permissions.IsAuthenticated]
-    search_fields = ['full_name', 'phone', 'member_id', 'email']
-    filterset_fields = ['gender', 'marital_status', 'saved', 'baptized']
+    filter_backends = [FieldFilterBackend, DateRangeFilterBackend, IndexedSearchFilter]
+    filterset_fields = ['member_type', 'gender', 'marital_status', 'saved', 'baptized']
+    date_range_field = 'joined_date'
+    conditional_related = ('children', 'main_ministry')
+    export_name = 'members'
+    # Same columns the importer reads, so an export can be re-imported
+    export_fields = [
+        (field.name, field.name) for field in Member._meta.concrete_fields
+        if field.name not in ('id', 'passport_photo', 'photo_hash', 'phone_key', 'name_key', 'main_ministry')
+    ] + [('main_ministry', 'main_ministry__name')]
 
-class ChildViewSet(viewsets.ModelViewSet):
+    def get_export_header(self):
+        return super().get_export_header() + ['children']
+
+    def get_export_rows(self, queryset):
+        lookups = ['id'] + [lookup for _, lookup in self.export_fields]
+        rows = queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+        for chunk in chunked(rows):
+            # One children query per chunk of members
+            children = defaultdict(list)
+            for member_id, name in Child.objects.filter(member_id__in=[row[0] for row in chunk]).values_list('member_id', 'full_name'):
+                children[member_id].append(name)
+            for row in chunk:
+                yield row[1:] + ('; '.join(children[row[0]]),)
+
+    def check_ministry(self, ministry):
+        scope = get_scope(self.request)
+        if not scope.is_full and (ministry is None or ministry.pk not in scope.ministry_ids):
+            raise PermissionDenied('Members can only be placed in your own ministries.')
+
+    def perform_create(self, serializer):
+        self.check_ministry(serializer.validated_data.get('main_ministry'))
+        serializer.save()
+
+    def perform_update(self, serializer):
+        if 'main_ministry' in serializer.validated_data:
+            self.check_ministry(serializer.validated_data['main_ministry'])
+        serializer.save()
+
+    def _bulk_queryset(self, selection):
+        queryset = self.get_queryset()
+        if 'ids' in selection:
+            return queryset.filter(pk__in=selection['ids'])
+        return queryset.filter(**selection['filter'])
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_update(self, request):
+        serializer = MemberBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data['update']
+        if 'main_ministry' in changes:
+            self.check_ministry(changes['main_ministry'])
+
+        # One UPDATE statement for the whole selection
+        with transaction.atomic():
+            queryset = self._bulk_queryset(serializer.validated_data)
+            if any(field in changes for field in COUNTED_FIELDS):
+                # .update() sends no signals, so adjust the dashboard counters here
+                ids = list(queryset.values_list('pk', flat=True))
+                with track_members(ids) as tracked, track_scope_exits(ids):
+                    updated = tracked.queryset.update(**changes, updated_at=timezone.now())
+            else:
+                updated = queryset.update(**changes, updated_at=timezone.now())
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        serializer = MemberBulkSelectSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            _, deleted = self._bulk_queryset(serializer.validated_data).delete()
+        return Response({'deleted': deleted.get(Member._meta.label, 0)})
+
+    @action(detail=False, methods=['get'], url_path='possible-duplicates')
+    def possible_duplicates(self, request):
+        params = request.query_params
+        try:
+            exclude = int(params['exclude']) if params.get('exclude') else None
+        except ValueError:
+            return Response({'error': 'exclude must be a member id'}, status=status.HTTP_400_BAD_REQUEST)
+        scope = get_scope(request)
+        return Response(find_candidates(
+            full_name=params.get('full_name', ''),
+            phone=params.get('phone', ''),
+            national_id=params.get('national_id', ''),
+            exclude_member=exclude,
+            members=scope.filter(Member.objects.all()),
+            visitors=scope.filter(Visitor.objects.all(), None),
+        ))
+
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        primary = self.get_object()
+        duplicate_id = request.data.get('duplicate')
+        if not duplicate_id:
+            return Response({'error': 'duplicate is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            duplicate_id = int(duplicate_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'duplicate must be a member id'}, status=status.HTTP_400_BAD_REQUEST)
+        duplicate = self.get_queryset().filter(pk=duplicate_id).exclude(pk=primary.pk).first()
+        if duplicate is None:
+            return Response({'error': 'duplicate member not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        merged = merge_members(primary, duplicate)
+        return Response({'merged': merged, 'member': MemberSerializer(primary, context=self.get_serializer_context()).data})
+
+    @action(detail=True, methods=['get'])
+    def attendance(self, request, pk=None):
+        """`?services=52&years=3`: attendance rate over the last services, streaks and a heatmap."""
+        member = self.get_object()
+        limits = {'services': (52, 520), 'years': (3, 20)}
+        params = {}
+        for name, (default, maximum) in limits.items():
+            try:
+                params[name] = int(request.query_params.get(name, default))
+            except ValueError:
+                return Response({'error': f'{name} must be a whole number'}, status=status.HTTP_400_BAD_REQUEST)
+            if not 1 <= params[name] <= maximum:
+                return Response({'error': f'{name} must be between 1 and {maximum}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(attendance_summary(member.pk, **params))
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def import_members(self, request):
+        if not get_scope(request).is_full:
+            raise PermissionDenied('Importing members needs full access.')
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = MemberImporter(
+            dry_run=request.data.get('dry_run') in ('1', 'true', 'True'),
+            upsert=request.data.get('upsert') in ('1', 'true', 'True'),
+        )
+        try:
+            report = importer.run(iter_rows(upload, upload.name))
+        except ImportFileError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+class ChildViewSet(RowScopeMixin, viewsets.ModelViewSet):
     queryset = Child.objects.all()
     serializer_class = ChildSerializer
     permission_classes = [permissions.IsAuthenticated]
+    scope_path = 'member__'
 
 class DashboardStatsView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        total_members = Member.objects.count()
-        new_members = Member.objects.filter(member_type='NEW').count()
-        baptized_members = Member.objects.filter(baptized=True).count()
-        active_ministries = Ministry.objects.count()
-        
+        # Calendar months, oldest first, ending with the current one
+        today = timezone.localdate()
+        months = []
+        year, month = today.year, today.month
+        for _ in range(6):
+            months.insert(0, today.replace(year=year, month=month, day=1))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+        scope = get_scope(request)
+        members = scope.filter(Member.objects.all())
+        if scope.is_full:
+            # All counters in one read on the (period, bucket) index
+            counters = {
+                (metric, period, bucket): value
+                for metric, period, bucket, value in StatCounter.objects.filter(
+                    Q(period=StatCounter.PERIOD_ALL, bucket=EPOCH)
+                    | Q(period=StatCounter.PERIOD_MONTH, bucket__in=months, metric='members')
+                ).values_list('metric', 'period', 'bucket', 'value')
+            }
+        else:
+            # The stored counters are church-wide; count the scope's members
+            # in one grouped query instead
+            counters = member_counts(members)
+            counters['ministries', StatCounter.PERIOD_ALL, EPOCH] = len(scope.ministry_ids)
+        totals = {
+            metric: value for (metric, period, _), value in counters.items()
+            if period == StatCounter.PERIOD_ALL
+        }
+
         # Recent activity (members only)
-        recent_members = Member.objects.all().order_by('-created_at')[:5]
-        
+        recent_members = members.only('id', 'full_name', 'member_type', 'created_at').order_by('-created_at', '-id')[:5]
+
         activities = []
         for m in recent_members:
             activities.append({
@@ -39,29 +224,30 @@ class DashboardStatsView(views.APIView):
                 'timestamp': m.created_at,
                 'description': f'Registered as {m.get_member_type_display()}'
             })
-            
-        # Sort activities by timestamp desc
-        activities.sort(key=lambda x: x['timestamp'], reverse=True)
-
-        # Growth data (last 6 months)
-        growth_data = []
-        for i in range(5, -1, -1):
-            date = timezone.now() - timedelta(days=i*30)
-            month_name = date.strftime('%b')
-            count = Member.objects.filter(
-                created_at__year=date.year,
-                created_at__month=date.month
-            ).count()
-            growth_data.append({
-                'month': month_name,
-                'members': count
-            })
+
+        growth_data = [{
+            'month': month.strftime('%b'),
+            'members': counters.get(('members', StatCounter.PERIOD_MONTH, month), 0)
+        } for month in months]
+
+        ministry_names = dict(Ministry.objects.values_list('id', 'name'))
+        by_ministry = {}
+        for metric, value in totals.items():
+            if metric.startswith('members.ministry.') and value:
+                name = ministry_names.get(int(metric.rsplit('.', 1)[1]))
+                if name is not None:
+                    by_ministry[name] = value
 
         return Response({
-            'total_members': total_members,
-            'new_members': new_members,
-            'baptized_members': baptized_members,
-            'active_ministries': active_ministries,
+            'total_members': totals.get('members', 0),
+            'new_members': totals.get('members.type.NEW', 0),
+            'baptized_members': totals.get('members.baptized', 0),
+            'saved_members': totals.get('members.saved', 0),
+            'active_ministries': totals.get('ministries', 0),
+            'members_by_gender': {
+                gender: totals.get(f'members.gender.{gender}', 0) for gender, _ in Member.GENDER_CHOICES
+            },
+            'members_by_ministry': by_ministry,
             'activities': activities,
             'growth_data': growth_data
         })
@@ -74,24 +260,27 @@ class GlobalSearchView(views.APIView):
         if not query:
             return Response([])
 
-        # Search members
-        members = Member.objects.filter(full_name__icontains=query)[:5]
-        member_results = [{
-            'id': m.id,
-            'type': 'member',
-            'title': m.full_name,
-            'subtitle': m.member_id,
-            'path': f'/members/{m.id}'
-        } for m in members]
-
-        # Search ministries
-        ministries = Ministry.objects.filter(name__icontains=query)[:3]
-        ministry_results = [{
-            'id': min.id,
-            'type': 'ministry',
-            'title': min.name,
-            'subtitle': 'Ministry',
-            'path': f'/ministries/{min.id}'
-        } for min in ministries]
-
-        return Response(member_results + ministry_results)
+        # One ranked lookup over the search index (members, ministries, visitors)
+        paths = {
+            'member': '/members/{}',
+            'ministry': '/ministries/{}',
+            'visitor': '/attendance',
+        }
+        results = [{
+            'id': hit['object_id'],
+            'type': hit['kind'],
+            'title': hit['title'],
+            'subtitle': hit['subtitle'],
+            'path': paths[hit['kind']].format(hit['object_id'])
+        } for hit in search(query, limit=8, within=self.searchable(request))]
+
+        return Response(results)
+
+    def searchable(self, request):
+        scope = get_scope(request)
+        if scope.is_full:
+            return None
+        return {
+            'member': scope.filter(Member.objects.all()).values('pk'),
+            'ministry': scope.ministry_ids,
+        }
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ministries', '0002_ministry_ministry_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ministry',
+            index=models.Index(fields=['updated_at', 'id'], name='ministry_updated_idx'),
+        ),
+    ]
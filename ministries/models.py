@@ -12,7 +12,7 @@ class Ministry(TimeStampedModel):
         related_name='led_ministries'
     )
 
-    class Meta:
+    class Meta(TimeStampedModel.Meta):
         verbose_name_plural = "Ministries"
 
     def __str__(self):
@@ -3,16 +3,24 @@ from .models import Ministry
 
 class MinistrySerializer(serializers.ModelSerializer):
     leader_name = serializers.ReadOnlyField(source='leader.username')
+    # Read from the MinistryViewSet annotations when present
     member_count = serializers.SerializerMethodField()
+    new_member_count = serializers.SerializerMethodField()
+    baptized_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Ministry
         fields = '__all__'
 
+    def _count(self, obj, annotation, queryset):
+        value = getattr(obj, annotation, None)
+        return queryset.count() if value is None else value
+
     def get_member_count(self, obj):
-        # Assuming Member model has a ministry field or many-to-many
-        # If not yet implemented, return 0
-        try:
-            return obj.members.count()
-        except:
-            return 0
+        return self._count(obj, 'member_count', obj.members.all())
+
+    def get_new_member_count(self, obj):
+        return self._count(obj, 'new_member_count', obj.members.filter(member_type='NEW'))
+
+    def get_baptized_count(self, obj):
+        return self._count(obj, 'baptized_count', obj.members.filter(baptized=True))
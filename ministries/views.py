@@ -1,8 +1,31 @@
+from django.db.models import Count, Q
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from .models import Ministry
 from .serializers import MinistrySerializer
+from accounts.scoping import get_scope
+from core.mixins import ConditionalRequestMixin, optimize_queryset
+from members.models import Member
+from members.serializers import MemberListSerializer
+from search.filters import IndexedSearchFilter
 
-class MinistryViewSet(viewsets.ModelViewSet):
-    queryset = Ministry.objects.all()
+class MinistryViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    queryset = Ministry.objects.select_related('leader').annotate(
+        member_count=Count('members'),
+        new_member_count=Count('members', filter=Q(members__member_type='NEW')),
+        baptized_count=Count('members', filter=Q(members__baptized=True)),
+    )
     serializer_class = MinistrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    conditional_related = ('members',)
+
+    @action(detail=True, methods=['get'])
+    def members(self, request, pk=None):
+        """Paginated roster of the ministry's members; `?search=` by name, phone or member id."""
+        ministry = self.get_object()
+        queryset = get_scope(request).filter(Member.objects.filter(main_ministry=ministry))
+        queryset = IndexedSearchFilter().filter_queryset(request, queryset, self)
+        queryset = optimize_queryset(queryset, MemberListSerializer())
+        page = self.paginate_queryset(queryset)
+        serializer = MemberListSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,42 @@
+from attendance.models import Visitor
+from members.models import Member
+from ministries.models import Ministry
+from .index import Document, register
+from .models import SearchEntry
+
+
+def member_document(member):
+    return Document(
+        title=member.full_name,
+        subtitle=member.member_id,
+        text=[
+            (member.full_name, 3),
+            (member.member_id, 3),
+            (member.national_id, 3),
+            (member.also_known_as, 2),
+            (member.email, 1),
+        ],
+        phones=[(member.phone, 2)],
+    )
+
+
+def ministry_document(ministry):
+    return Document(
+        title=ministry.name,
+        subtitle='Ministry',
+        text=[(ministry.name, 3)],
+    )
+
+
+def visitor_document(visitor):
+    return Document(
+        title=visitor.full_name,
+        subtitle='Visitor',
+        text=[(visitor.full_name, 2), (visitor.residence, 1)],
+        phones=[(visitor.phone_number, 2)],
+    )
+
+
+register(Member, SearchEntry.Kind.MEMBER, member_document)
+register(Ministry, SearchEntry.Kind.MINISTRY, ministry_document)
+register(Visitor, SearchEntry.Kind.VISITOR, visitor_document)
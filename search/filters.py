@@ -0,0 +1,14 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .index import kind_for_model, matching_ids
+
+
+class IndexedSearchFilter(BaseFilterBackend):
+    """`?search=` backed by the search index instead of `LIKE '%q%'` scans."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return queryset.filter(pk__in=matching_ids(query, kind_for_model(queryset.model)))
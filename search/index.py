@@ -0,0 +1,198 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Q, Sum, When
+
+from core.utils import normalize_phone
+from .models import SearchEntry, SearchTerm
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TOKENS = 5
+# Phone numbers are also indexed reversed so that "…5678" is a prefix lookup
+SUFFIX_MARKER = '~'
+
+_registry = {}
+
+
+class Document:
+    """What the index stores for one object: display text plus weighted terms."""
+
+    def __init__(self, title, subtitle='', text=(), phones=()):
+        self.title = title or ''
+        self.subtitle = subtitle or ''
+        self.text = text
+        self.phones = phones
+
+    def terms(self):
+        weights = {}
+        for value, weight in self.text:
+            for token in tokenize(value):
+                weights[token] = max(weights.get(token, 0), weight)
+        for value, weight in self.phones:
+            digits = normalize_phone(value)
+            if not digits:
+                continue
+            for token in (digits, SUFFIX_MARKER + digits[::-1]):
+                weights[token] = max(weights.get(token, 0), weight)
+        return weights
+
+
+def register(model, kind, document):
+    _registry[model] = (kind, document)
+
+
+def registered_models():
+    return list(_registry)
+
+
+def kind_for_model(model):
+    return _registry[model][0]
+
+
+def tokenize(value):
+    if not value:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(str(value).lower())]
+
+
+def _build_entry(instance):
+    kind, document = _registry[type(instance)]
+    doc = document(instance)
+    entry = SearchEntry(kind=kind, object_id=instance.pk, title=doc.title[:255], subtitle=doc.subtitle[:255])
+    return entry, doc.terms()
+
+
+@transaction.atomic
+def index_object(instance):
+    entry, terms = _build_entry(instance)
+    entry, _ = SearchEntry.objects.update_or_create(
+        kind=entry.kind,
+        object_id=entry.object_id,
+        defaults={'title': entry.title, 'subtitle': entry.subtitle},
+    )
+    entry.terms.all().delete()
+    SearchTerm.objects.bulk_create(
+        SearchTerm(entry=entry, term=term, weight=weight) for term, weight in terms.items()
+    )
+
+
+def remove_object(instance):
+    kind = kind_for_model(type(instance))
+    SearchEntry.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+@transaction.atomic
+def index_objects(instances, batch_size=500):
+    """Bulk (re)index an iterable of objects of one registered model."""
+    count = 0
+    batch = []
+    for instance in instances:
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            count += _index_batch(batch)
+            batch = []
+    if batch:
+        count += _index_batch(batch)
+    return count
+
+
+def _index_batch(instances):
+    built = [_build_entry(instance) for instance in instances]
+    kind = built[0][0].kind
+    SearchEntry.objects.filter(kind=kind, object_id__in=[i.pk for i in instances]).delete()
+    entries = SearchEntry.objects.bulk_create(entry for entry, _ in built)
+    SearchTerm.objects.bulk_create(
+        (
+            SearchTerm(entry=entry, term=term, weight=weight)
+            for entry, (_, terms) in zip(entries, built)
+            for term, weight in terms.items()
+        ),
+        batch_size=2000,
+    )
+    return len(entries)
+
+
+def _token_match(token):
+    # Half-open range instead of LIKE so every backend can use the term index
+    match = Q(term__gte=token, term__lt=token + '\uffff')
+    if token.isdigit() and len(token) >= 3:
+        suffix = SUFFIX_MARKER + token[::-1]
+        match |= Q(term__gte=suffix, term__lt=suffix + '\uffff')
+        local = normalize_phone(token)
+        if local != token:
+            match |= Q(term__gte=local, term__lt=local + '\uffff')
+    return match
+
+
+def _matching_terms(query, kinds=None, within=None):
+    tokens = tokenize(query)[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return None
+    matches = [_token_match(token) for token in tokens]
+    terms = SearchTerm.objects.filter(reduce(or_, matches))
+    if kinds:
+        terms = terms.filter(entry__kind__in=kinds)
+    if within is not None:
+        if not within:
+            return None
+        terms = terms.filter(reduce(or_, (
+            Q(entry__kind=kind, entry__object_id__in=ids) for kind, ids in within.items()
+        )))
+    # Every query token has to match at least one term of the entry
+    matched = {
+        f'match_{i}': Max(Case(When(match, then=1), default=0, output_field=IntegerField()))
+        for i, match in enumerate(matches)
+    }
+    return terms, tokens, matched
+
+
+def search(query, kinds=None, limit=10, within=None):
+    """
+    Ranked prefix search over the index, in a single grouped query.
+    `within` ({kind: ids or id subquery}) limits the search to those objects.
+
+    Returns dicts with kind, object_id, title and subtitle, best match first:
+    entries with exact term hits rank above prefix-only hits, then by the
+    summed weight of the matching terms.
+    """
+    prepared = _matching_terms(query, kinds, within)
+    if prepared is None:
+        return []
+    terms, tokens, matched = prepared
+    rows = (
+        terms.values('entry__kind', 'entry__object_id', 'entry__title', 'entry__subtitle')
+        .annotate(
+            **matched,
+            exact=Sum(Case(When(term__in=tokens, then='weight'), default=0, output_field=IntegerField())),
+            score=Sum('weight'),
+        )
+        .filter(**{name: 1 for name in matched})
+        .order_by('-exact', '-score', 'entry__title')[:limit]
+    )
+    return [
+        {
+            'kind': row['entry__kind'],
+            'object_id': row['entry__object_id'],
+            'title': row['entry__title'],
+            'subtitle': row['entry__subtitle'],
+        }
+        for row in rows
+    ]
+
+
+def matching_ids(query, kind):
+    """Subquery of object ids of `kind` matching `query`, for use with pk__in."""
+    prepared = _matching_terms(query, [kind])
+    if prepared is None:
+        return SearchEntry.objects.none().values('object_id')
+    terms, _, matched = prepared
+    return (
+        terms.values('entry__object_id')
+        .annotate(**matched)
+        .filter(**{name: 1 for name in matched})
+        .values('entry__object_id')
+    )
+
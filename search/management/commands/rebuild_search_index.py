@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from search.index import index_objects, kind_for_model, registered_models
+from search.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index for members, ministries and visitors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Only index models that have no entries yet (safe to run on every deploy)',
+        )
+
+    def handle(self, *args, **options):
+        for model in registered_models():
+            entries = SearchEntry.objects.filter(kind=kind_for_model(model))
+            if options['if_empty'] and entries.exists():
+                continue
+            entries.delete()
+            count = index_objects(
+                model.objects.all().iterator(chunk_size=options['batch_size']),
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(f"Indexed {count} {str(model._meta.verbose_name_plural).lower()}")
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
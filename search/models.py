@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    class Kind(models.TextChoices):
+        MEMBER = 'member', 'Member'
+        MINISTRY = 'ministry', 'Ministry'
+        VISITOR = 'visitor', 'Visitor'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    # Denormalized so results render straight from the index
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        verbose_name_plural = "Search entries"
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+class SearchTerm(models.Model):
+    entry = models.ForeignKey(SearchEntry, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'entry'], name='search_term_idx'),
+        ]
+
+    def __str__(self):
+        return self.term
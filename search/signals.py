@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import documents  # noqa: F401  (registers the indexed models)
+from .index import index_object, registered_models, remove_object
+
+
+def update_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: index_object(instance))
+
+
+def delete_from_index(sender, instance, **kwargs):
+    remove_object(instance)
+
+
+for model in registered_models():
+    post_save.connect(update_index, sender=model, dispatch_uid=f'search_index_{model._meta.label}')
+    post_delete.connect(delete_from_index, sender=model, dispatch_uid=f'search_remove_{model._meta.label}')
@@ -0,0 +1,109 @@
+import datetime
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import StatCounter
+
+EPOCH = datetime.date(1970, 1, 1)
+# Member fields the counters depend on; changing any other field leaves them alone
+COUNTED_FIELDS = ('member_type', 'gender', 'saved', 'baptized', 'main_ministry')
+MEMBER_FIELDS = ('member_type', 'gender', 'saved', 'baptized', 'main_ministry_id')
+
+
+def member_metrics(member_type, gender, saved, baptized, main_ministry_id):
+    metrics = ['members', f'members.type.{member_type}', f'members.gender.{gender}']
+    if saved:
+        metrics.append('members.saved')
+    if baptized:
+        metrics.append('members.baptized')
+    if main_ministry_id:
+        metrics.append(f'members.ministry.{main_ministry_id}')
+    return metrics
+
+
+def buckets(day):
+    return [
+        (StatCounter.PERIOD_ALL, EPOCH),
+        (StatCounter.PERIOD_DAY, day),
+        (StatCounter.PERIOD_MONTH, day.replace(day=1)),
+    ]
+
+
+def member_keys(state, day):
+    """Counter keys a member with `state` (values of MEMBER_FIELDS) registered on `day` adds to."""
+    return [
+        (metric, period, bucket)
+        for metric in member_metrics(*state)
+        for period, bucket in buckets(day)
+    ]
+
+
+def member_state(member):
+    return tuple(getattr(member, field) for field in MEMBER_FIELDS)
+
+
+def registration_day(created_at):
+    return timezone.localtime(created_at).date()
+
+
+def member_counts(queryset):
+    """Counter contributions of every member in `queryset`, from one GROUP BY query."""
+    rows = (
+        queryset.annotate(day=TruncDate('created_at'))
+        .values('day', *MEMBER_FIELDS)
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    counts = Counter()
+    for row in rows:
+        for key in member_keys(tuple(row[field] for field in MEMBER_FIELDS), row['day']):
+            counts[key] += row['n']
+    return counts
+
+
+@transaction.atomic
+def apply(deltas):
+    """Add `deltas` ({(metric, period, bucket): n}) to the stored counters."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    StatCounter.objects.bulk_create(
+        [StatCounter(metric=metric, period=period, bucket=bucket) for metric, period, bucket in deltas],
+        ignore_conflicts=True,
+    )
+    # Usually just +1 and -1: one UPDATE ... SET value = value + n per distinct n
+    by_delta = defaultdict(list)
+    for key, delta in deltas.items():
+        by_delta[delta].append(key)
+    for delta, keys in by_delta.items():
+        match = reduce(or_, (Q(metric=metric, period=period, bucket=bucket) for metric, period, bucket in keys))
+        StatCounter.objects.filter(match).update(value=F('value') + delta)
+
+
+class track_members:
+    """
+    Keep counters right across bulk writes that skip model signals:
+
+        with track_members(ids):
+            Member.objects.filter(pk__in=ids).update(...)
+    """
+
+    def __init__(self, ids):
+        from members.models import Member
+        self.queryset = Member.objects.filter(pk__in=list(ids))
+
+    def __enter__(self):
+        self.before = member_counts(self.queryset)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            after = member_counts(self.queryset)
+            after.subtract(self.before)
+            apply(after)
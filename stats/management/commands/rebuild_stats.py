@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from members.models import Member
+from ministries.models import Ministry
+from stats.counters import EPOCH, member_counts
+from stats.models import StatCounter
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard counters from the members and ministries tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Do nothing when counters already exist (safe to run on every deploy)',
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        if options['if_empty'] and StatCounter.objects.exists():
+            return
+        counts = member_counts(Member.objects.all())
+        counts[('ministries', StatCounter.PERIOD_ALL, EPOCH)] = Ministry.objects.count()
+
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(
+            (
+                StatCounter(metric=metric, period=period, bucket=bucket, value=value)
+                for (metric, period, bucket), value in counts.items()
+            ),
+            batch_size=1000,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(counts)} counters"))
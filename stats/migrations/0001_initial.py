@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('period', models.CharField(choices=[('all', 'All time'), ('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('bucket', models.DateField()),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'bucket'], name='statcounter_period_idx')],
+                'unique_together': {('metric', 'period', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class StatCounter(models.Model):
+    PERIOD_ALL = 'all'
+    PERIOD_DAY = 'day'
+    PERIOD_MONTH = 'month'
+    PERIOD_CHOICES = [
+        (PERIOD_ALL, 'All time'),
+        (PERIOD_DAY, 'Day'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    # e.g. 'members', 'members.baptized', 'members.gender.FEMALE', 'members.ministry.3'
+    metric = models.CharField(max_length=100)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    # Day, first day of the month, or EPOCH for all-time counters
+    bucket = models.DateField()
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('metric', 'period', 'bucket')
+        indexes = [
+            models.Index(fields=['period', 'bucket'], name='statcounter_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} [{self.period} {self.bucket}] = {self.value}"
@@ -0,0 +1,51 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from members.models import Member
+from ministries.models import Ministry
+from .counters import EPOCH, apply, member_keys, member_state, registration_day, MEMBER_FIELDS
+from .models import StatCounter
+
+
+def remember_member_state(sender, instance, raw=False, **kwargs):
+    instance._stats_previous = None
+    if raw or instance._state.adding:
+        return
+    previous = Member.objects.filter(pk=instance.pk).values_list('created_at', *MEMBER_FIELDS).first()
+    if previous is not None:
+        instance._stats_previous = (registration_day(previous[0]), previous[1:])
+
+
+def count_member_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = Counter(member_keys(member_state(instance), registration_day(instance.created_at)))
+    previous = getattr(instance, '_stats_previous', None)
+    if previous is not None:
+        day, state = previous
+        deltas.subtract(member_keys(state, day))
+    apply(deltas)
+
+
+def count_member_delete(sender, instance, **kwargs):
+    deltas = Counter(member_keys(member_state(instance), registration_day(instance.created_at)))
+    apply({key: -n for key, n in deltas.items()})
+
+
+def count_ministry_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply({('ministries', StatCounter.PERIOD_ALL, EPOCH): 1})
+
+
+def count_ministry_delete(sender, instance, **kwargs):
+    apply({('ministries', StatCounter.PERIOD_ALL, EPOCH): -1})
+    # Its members were moved to no ministry by SET_NULL, which sends no signals
+    StatCounter.objects.filter(metric=f'members.ministry.{instance.pk}').delete()
+
+
+pre_save.connect(remember_member_state, sender=Member, dispatch_uid='stats_member_pre_save')
+post_save.connect(count_member_save, sender=Member, dispatch_uid='stats_member_save')
+post_delete.connect(count_member_delete, sender=Member, dispatch_uid='stats_member_delete')
+post_save.connect(count_ministry_save, sender=Ministry, dispatch_uid='stats_ministry_save')
+post_delete.connect(count_ministry_delete, sender=Ministry, dispatch_uid='stats_ministry_delete')
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from uuid import uuid4
+
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.live import attendance_change, publish
+from attendance.models import Attendance, Event, Visitor
+from attendance.rollup import apply_changes
+from members.models import Member
+from .models import ClientOperation
+
+
+def _recorded(row):
+    return row.recorded_at or row.updated_at
+
+
+@transaction.atomic
+def apply_checkins(operations, device='', members=None):
+    """
+    Apply a device's queued check-in operations in one transaction and
+    return one result per operation, in order.
+
+    An operation id seen before (earlier in this batch, or in an earlier or
+    concurrent upload) is a `duplicate` and changes nothing. Attendance for the same member and
+    event is last-writer-wins on the device timestamp: an operation older
+    than what is stored, or than another operation in the batch, is `stale`.
+    Operations that failed validation (carrying `errors`, see
+    CheckinBatchSerializer) or naming an unknown event or a member outside
+    `members` (a Member queryset, everyone by default) are `rejected`.
+    Rejected and stale operations are still receipted, so devices can drop
+    them; invalid ones only when their id could be read.
+    """
+    results = {}
+    first = {}
+    for op in operations:
+        if op['id'] is not None:
+            first.setdefault(op['id'], op)
+    # Receipt the ids up front: an upload of the same operations running
+    # concurrently waits on the unique op_id, then finds them taken
+    claim = f'claim:{uuid4().hex[:12]}'
+    ClientOperation.objects.bulk_create([
+        ClientOperation(op_id=op_id, device=device, kind=op.get('type', ''), status=claim)
+        for op_id, op in first.items()
+    ], ignore_conflicts=True)
+    taken = ClientOperation.objects.filter(op_id__in=list(first)).exclude(status=claim)
+    for op_id, status in taken.values_list('op_id', 'status'):
+        results[op_id] = {'status': 'duplicate', 'original': status}
+    fresh = [op for op_id, op in first.items() if op_id not in results]
+    valid = [op for op in fresh if 'errors' not in op]
+
+    events = set(Event.objects.filter(pk__in={op['event'] for op in valid}).values_list('pk', flat=True))
+    members = set((Member.objects.all() if members is None else members).filter(
+        pk__in={op['member'] for op in valid if op['type'] == 'attendance'}
+    ).values_list('pk', flat=True))
+
+    latest, visitors = {}, []
+    for op in fresh:
+        if 'errors' in op:
+            results[op['id']] = {'status': 'rejected', 'errors': op['errors']}
+        elif op['event'] not in events:
+            results[op['id']] = {'status': 'rejected', 'error': 'Unknown event'}
+        elif op['type'] == 'visitor':
+            visitors.append(op)
+        elif op['member'] not in members:
+            results[op['id']] = {'status': 'rejected', 'error': 'Unknown member'}
+        else:
+            key = (op['member'], op['event'])
+            current = latest.get(key)
+            if current is None or op['timestamp'] >= current['timestamp']:
+                if current is not None:
+                    results[current['id']] = {'status': 'stale'}
+                latest[key] = op
+            else:
+                results[op['id']] = {'status': 'stale'}
+
+    existing = {}
+    if latest:
+        rows = Attendance.objects.select_for_update().filter(
+            event_id__in={event for _, event in latest},
+            member_id__in={member for member, _ in latest},
+        )
+        existing = {(row.member_id, row.event_id): row for row in rows}
+
+    now = timezone.now()
+    to_create, to_update = [], []
+
+    def settle(row, op):
+        if op['timestamp'] > _recorded(row):
+            write(row, op)
+            to_update.append(row)
+        else:
+            results[op['id']] = {'status': 'stale'}
+
+    def write(row, op):
+        row.status = op['status']
+        row.recorded_at = op['timestamp']
+        row.updated_at = now
+        results[op['id']] = {'status': 'applied'}
+
+    for (member, event), op in latest.items():
+        row = existing.get((member, event))
+        if row is None:
+            row = Attendance(member_id=member, event_id=event)
+            write(row, op)
+            to_create.append(row)
+        else:
+            settle(row, op)
+    Attendance.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_create:
+        # Rows another request created since the read above were skipped by
+        # the insert; settle those against what that request wrote
+        landed = {}
+        rows = Attendance.objects.select_for_update().filter(
+            event_id__in={row.event_id for row in to_create},
+            member_id__in={row.member_id for row in to_create},
+        )
+        for row in rows:
+            landed[row.member_id, row.event_id] = row
+        created = []
+        for row in to_create:
+            key = (row.member_id, row.event_id)
+            stored = landed.get(key)
+            if stored is None:
+                # Deleted again by the time we looked
+                results[latest[key]['id']] = {'status': 'stale'}
+            elif stored.status == row.status and stored.recorded_at == row.recorded_at:
+                created.append(stored)
+            else:
+                settle(stored, latest[key])
+        to_create = created
+    Attendance.objects.bulk_update(to_update, ['status', 'recorded_at', 'updated_at'])
+    apply_changes([(row.member_id, row.event_id, row.status) for row in to_create + to_update])
+    if to_create or to_update:
+        Event.objects.filter(pk__in={row.event_id for row in to_create + to_update}).touch()
+
+    for op in visitors:
+        # Saved one by one so search indexing and live updates see them
+        visitor = Visitor.objects.create(
+            event_id=op['event'],
+            full_name=op['full_name'],
+            phone_number=op.get('phone_number'),
+            residence=op.get('residence'),
+        )
+        results[op['id']] = {'status': 'applied', 'visitor': visitor.pk}
+
+    by_status = defaultdict(list)
+    for op in fresh:
+        by_status[results[op['id']]['status']].append(op['id'])
+    for status, op_ids in by_status.items():
+        ClientOperation.objects.filter(op_id__in=op_ids).update(status=status)
+
+    # Bulk writes send no signals; tell live devices directly
+    changes = {}
+    for row in to_create + to_update:
+        changes.setdefault(row.event_id, []).append(attendance_change(row))
+
+    def notify():
+        for event, event_changes in changes.items():
+            publish(event, event_changes)
+    transaction.on_commit(notify)
+
+    replies = []
+    for op in operations:
+        if op['id'] is None:
+            replies.append({'id': None, 'status': 'rejected', 'errors': op['errors']})
+        elif first[op['id']] is op:
+            replies.append({'id': op['id'], **results[op['id']]})
+        else:
+            # Repeated within the batch: only the first occurrence counts
+            original = results[op['id']]
+            replies.append({'id': op['id'], 'status': 'duplicate', 'original': original.get('original', original['status'])})
+    return replies
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientOperation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('op_id', models.CharField(max_length=64, unique=True)),
+                ('device', models.CharField(blank=True, max_length=100)),
+                ('kind', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('received_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0002_clientoperation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='ministry_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted row, so offline clients can drop it from their replica.
+
+    The auto-increment id doubles as the monotonic change counter that sync
+    watermarks point into. With `ministry_id` set, the row was not deleted but
+    moved out of that ministry, and only leaders scoped to it should drop it.
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    ministry_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'id'], name='tombstone_model_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+
+class ClientOperation(models.Model):
+    """
+    Receipt for an operation uploaded by an offline device, keyed by the id
+    the device gave it, so uploading the same queue twice applies it once.
+    """
+    op_id = models.CharField(max_length=64, unique=True)
+    device = models.CharField(max_length=100, blank=True)
+    kind = models.CharField(max_length=20)
+    # applied, stale or rejected: what the first upload got back
+    status = models.CharField(max_length=20)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.op_id} ({self.status})"
@@ -0,0 +1,29 @@
+from attendance.models import Event
+from attendance.serializers import EventSerializer
+from members.models import Member
+from members.serializers import MemberListSerializer
+from ministries.models import Ministry
+from ministries.serializers import MinistrySerializer
+
+# URL name -> (queryset, serializer) of the resources offline clients replicate
+RESOURCES = {
+    'members': (Member.objects.all(), MemberListSerializer),
+    'ministries': (Ministry.objects.all(), MinistrySerializer),
+    'events': (Event.objects.with_counts(), EventSerializer),
+}
+
+# URL name -> path from the resource's model to Member, for resources
+# limited to the caller's row scope (see accounts.scoping)
+SCOPE_PATHS = {
+    'members': '',
+}
+
+# URL name -> queryset for the caller's scope, for resources whose rows are
+# shared but whose annotations count only the caller's members
+SCOPED_QUERYSETS = {
+    'events': lambda scope: Event.objects.with_counts(scope.ministry_ids),
+}
+
+
+def synced_models():
+    return [queryset.model for queryset, _ in RESOURCES.values()]
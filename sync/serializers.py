@@ -0,0 +1,49 @@
+from rest_framework import serializers
+
+from attendance.serializers import ATTENDANCE_STATUSES
+
+
+class CheckinOperationSerializer(serializers.Serializer):
+    TYPES = ('attendance', 'visitor')
+
+    id = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=TYPES)
+    # Device clock when the usher made the change
+    timestamp = serializers.DateTimeField()
+    event = serializers.IntegerField()
+    # attendance: the resulting status, not a toggle, so replays commute
+    member = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=ATTENDANCE_STATUSES, required=False)
+    # visitor
+    full_name = serializers.CharField(max_length=255, required=False)
+    phone_number = serializers.CharField(max_length=20, required=False, allow_blank=True, allow_null=True)
+    residence = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        required = ('member', 'status') if attrs['type'] == 'attendance' else ('full_name',)
+        missing = [name for name in required if not attrs.get(name)]
+        if missing:
+            raise serializers.ValidationError({name: ['This field is required.'] for name in missing})
+        return attrs
+
+
+class CheckinBatchSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 5000
+
+    device = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    operations = serializers.ListField(allow_empty=False, max_length=MAX_OPERATIONS)
+
+    def validate_operations(self, operations):
+        # One at a time: a malformed operation is rejected on its own
+        # instead of failing the whole queue
+        checked = []
+        for data in operations:
+            operation = CheckinOperationSerializer(data=data)
+            if operation.is_valid():
+                checked.append(operation.validated_data)
+                continue
+            op_id = None
+            if isinstance(data, dict) and 'id' not in operation.errors and 'non_field_errors' not in operation.errors:
+                op_id = operation.fields['id'].run_validation(data.get('id'))
+            checked.append({'id': op_id, 'errors': operation.errors})
+        return checked
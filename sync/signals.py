@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from members.models import Member
+from .models import Tombstone
+from .resources import synced_models
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
+
+
+def remember_ministry(sender, instance, raw=False, **kwargs):
+    instance._sync_ministry_id = None
+    if not raw and not instance._state.adding:
+        instance._sync_ministry_id = (
+            Member.objects.filter(pk=instance.pk).values_list('main_ministry_id', flat=True).first()
+        )
+
+
+def record_member_exit(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_sync_ministry_id', None)
+    if previous is not None and previous != instance.main_ministry_id:
+        Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk, ministry_id=previous)
+
+
+for model in synced_models():
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync_tombstone_{model._meta.label}')
+pre_save.connect(remember_ministry, sender=Member, dispatch_uid='sync_member_pre_save')
+post_save.connect(record_member_exit, sender=Member, dispatch_uid='sync_member_exit')
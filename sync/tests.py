@@ -0,0 +1,131 @@
+import uuid
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from attendance.models import Attendance, Event, Visitor
+from members.models import Member
+from ministries.models import Ministry
+from .models import ClientOperation
+
+
+@override_settings(SYNC_SAFETY_WINDOW_SECONDS=0)
+class SyncWatermarkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bishop', password='secret123', role=User.Role.BISHOP)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.members = [Member.objects.create(full_name=f'Member {i}', phone=f'07000000{i:02}') for i in range(5)]
+
+    def sync(self, since=None, client=None, **params):
+        if since:
+            params['since'] = since
+        response = (client or self.client).get(reverse('sync', args=['members']), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def sync_all(self, since=None, client=None, limit=2):
+        changed, deleted = [], []
+        while True:
+            data = self.sync(since, client, limit=limit)
+            changed += [row['id'] for row in data['changed']]
+            deleted += data['deleted']
+            since = data['watermark']
+            if not data['has_more']:
+                return changed, deleted, since
+
+    def test_pages_through_every_row_once(self):
+        changed, deleted, watermark = self.sync_all()
+        self.assertEqual(sorted(changed), sorted(m.pk for m in self.members))
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync_all(watermark)[:2], ([], []))
+
+    def test_changes_and_deletions_since_the_watermark(self):
+        _, _, watermark = self.sync_all()
+        member = self.members[0]
+        member.full_name = 'Renamed'
+        member.save()
+        gone = self.members[1].pk
+        self.members[1].delete()
+
+        changed, deleted, watermark = self.sync_all(watermark)
+        self.assertEqual(changed, [member.pk])
+        self.assertEqual(deleted, [gone])
+        self.assertEqual(self.sync_all(watermark)[:2], ([], []))
+
+    def test_members_leaving_a_leaders_scope_are_deleted_for_them(self):
+        leader = User.objects.create_user(username='leader', password='secret123', role=User.Role.MINISTRY_LEADER)
+        youth = Ministry.objects.create(name='Youth', leader=leader)
+        choir = Ministry.objects.create(name='Choir')
+        Member.objects.filter(pk__in=[m.pk for m in self.members[:2]]).update(main_ministry=youth)
+        client = APIClient()
+        client.force_authenticate(leader)
+        changed, _, watermark = self.sync_all(client=client)
+        self.assertEqual(sorted(changed), [self.members[0].pk, self.members[1].pk])
+        _, _, full_watermark = self.sync_all()
+
+        self.client.patch(reverse('member-detail', args=[self.members[0].pk]), {'main_ministry': choir.pk}, format='json')
+        self.assertEqual(self.sync_all(watermark, client)[:2], ([], [self.members[0].pk]))
+        # Church-wide replicas keep the member
+        changed, deleted, _ = self.sync_all(full_watermark)
+        self.assertEqual((changed, deleted), ([self.members[0].pk], []))
+
+    def test_invalid_watermark(self):
+        response = self.client.get(reverse('sync', args=['members']), {'since': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CheckinReplayTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='clerk', password='secret123', role=User.Role.DATA_ENTRY)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.member = Member.objects.create(full_name='Jane Doe', phone='0700000001')
+        self.event = Event.objects.create(name='Sunday Service', date=timezone.now())
+
+    def upload(self, operations):
+        response = self.client.post(reverse('sync-checkins'), {'device': 'desk-1', 'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [(result['id'], result['status']) for result in response.data['results']]
+
+    def operations(self):
+        now = timezone.now().isoformat()
+        return [
+            {'id': uuid.uuid4().hex, 'type': 'attendance', 'timestamp': now,
+             'event': self.event.pk, 'member': self.member.pk, 'status': 'PRESENT'},
+            {'id': uuid.uuid4().hex, 'type': 'visitor', 'timestamp': now,
+             'event': self.event.pk, 'full_name': 'Guest', 'phone_number': '0711000000'},
+        ]
+
+    def test_replaying_a_queue_applies_it_once(self):
+        operations = self.operations()
+        ids = [op['id'] for op in operations]
+        self.assertEqual(self.upload(operations), [(ids[0], 'applied'), (ids[1], 'applied')])
+        self.assertEqual(self.upload(operations), [(ids[0], 'duplicate'), (ids[1], 'duplicate')])
+        self.assertEqual(Attendance.objects.filter(event=self.event).count(), 1)
+        self.assertEqual(Visitor.objects.filter(event=self.event).count(), 1)
+        self.assertEqual(
+            dict(ClientOperation.objects.values_list('op_id', 'status')),
+            {ids[0]: 'applied', ids[1]: 'applied'},
+        )
+
+    def test_repeated_id_within_a_batch(self):
+        operation = self.operations()[0]
+        repeat = dict(operation, status='ABSENT')
+        self.assertEqual(self.upload([operation, repeat]), [(operation['id'], 'applied'), (operation['id'], 'duplicate')])
+        self.assertEqual(Attendance.objects.get(event=self.event).status, 'PRESENT')
+
+    def test_older_operations_are_stale(self):
+        newer, older = self.operations()[0], self.operations()[0]
+        older['timestamp'], older['status'] = '2020-01-01T00:00:00Z', 'ABSENT'
+        self.assertEqual(self.upload([newer]), [(newer['id'], 'applied')])
+        self.assertEqual(self.upload([older]), [(older['id'], 'stale')])
+        self.assertEqual(Attendance.objects.get(event=self.event).status, 'PRESENT')
+
+    def test_invalid_operations_are_rejected(self):
+        operation = dict(self.operations()[0], member=self.member.pk + 100)
+        self.assertEqual(self.upload([operation, {'type': 'attendance'}]), [(operation['id'], 'rejected'), (None, 'rejected')])
+        self.assertFalse(Attendance.objects.exists())
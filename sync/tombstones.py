@@ -0,0 +1,32 @@
+from members.models import Member
+from .models import Tombstone
+
+
+def record_scope_exits(previous):
+    """Tombstone members moved out of a ministry; `previous` maps their ids to the old main_ministry_id."""
+    current = dict(Member.objects.filter(pk__in=list(previous)).values_list('pk', 'main_ministry_id'))
+    Tombstone.objects.bulk_create(
+        Tombstone(model=Member._meta.label_lower, object_id=pk, ministry_id=ministry_id)
+        for pk, ministry_id in previous.items()
+        if ministry_id is not None and pk in current and current[pk] != ministry_id
+    )
+
+
+class track_scope_exits:
+    """
+    Record members leaving a leader's scope across bulk writes that skip model signals:
+
+        with track_scope_exits(ids):
+            Member.objects.filter(pk__in=ids).update(main_ministry=...)
+    """
+
+    def __init__(self, ids):
+        self.queryset = Member.objects.filter(pk__in=list(ids))
+
+    def __enter__(self):
+        self.previous = dict(self.queryset.values_list('pk', 'main_ministry_id'))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            record_scope_exits(self.previous)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import CheckinSyncView, SyncView
+
+urlpatterns = [
+    path('sync/checkins/', CheckinSyncView.as_view(), name='sync-checkins'),
+    path('sync/<str:resource>/', SyncView.as_view(), name='sync'),
+]
@@ -0,0 +1,142 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions, views
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+from accounts.scoping import get_scope
+from core.mixins import optimize_queryset
+from members.models import Member
+from .checkins import apply_checkins
+from .models import Tombstone
+from .resources import RESOURCES, SCOPE_PATHS, SCOPED_QUERYSETS
+from .serializers import CheckinBatchSerializer
+
+
+def encode_watermark(updated_at, last_id, tombstone_id, issued_at):
+    data = {
+        'u': updated_at.isoformat() if updated_at else None,
+        'i': last_id,
+        't': tombstone_id,
+        'h': issued_at.isoformat(),
+    }
+    return urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_watermark(token):
+    if not token:
+        return None, 0, 0, None
+    data = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    updated_at = parse_datetime(data['u']) if data['u'] else None
+    return updated_at, int(data['i']), int(data['t']), parse_datetime(data['h'])
+
+
+class SyncView(views.APIView):
+    """
+    `GET /sync/<resource>/?since=<watermark>`: rows changed and ids deleted
+    since the watermark, plus the watermark to send next time.
+
+    Changes are read in (updated_at, id) order and deletions from the
+    tombstone table by id. The watermark is held back by
+    SYNC_SAFETY_WINDOW_SECONDS on the last page, so rows written by
+    transactions that commit late are picked up on the next sync rather than
+    skipped; clients upsert by id, so seeing a row twice is harmless.
+    Members moved out of a leader's ministries are listed as deleted for that
+    leader.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 500
+    max_limit = 2000
+
+    def get(self, request, resource):
+        if resource not in RESOURCES:
+            raise NotFound(f'Unknown sync resource "{resource}"')
+        queryset, serializer_class = RESOURCES[resource]
+        model = queryset.model
+        scope = get_scope(request)
+        if resource in SCOPED_QUERYSETS:
+            queryset = SCOPED_QUERYSETS[resource](scope)
+        if resource in SCOPE_PATHS:
+            queryset = scope.filter(queryset, SCOPE_PATHS[resource])
+        try:
+            updated_at, last_id, tombstone_id, issued_at = decode_watermark(request.query_params.get('since'))
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({'since': ['Invalid watermark.']})
+
+        now = timezone.now()
+        horizon = now - timedelta(seconds=settings.SYNC_SAFETY_WINDOW_SECONDS)
+        if issued_at and issued_at < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            # Tombstones this old may be pruned already: start from scratch
+            return Response({'reset': True, 'changed': [], 'deleted': [], 'watermark': None, 'has_more': False})
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        serializer = serializer_class(many=True, context={'request': request})
+        changed = queryset.order_by('updated_at', 'id')
+        if updated_at is not None:
+            changed = changed.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=last_id))
+        rows = list(optimize_queryset(changed, serializer)[:limit + 1])
+        more_rows = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            new_key = (rows[-1].updated_at, rows[-1].id)
+            if not more_rows and new_key[0] > horizon:
+                new_key = (horizon, 0)
+            if updated_at is None or new_key > (updated_at, last_id):
+                updated_at, last_id = new_key
+
+        tombstones = Tombstone.objects.filter(model=model._meta.label_lower, id__gt=tombstone_id)
+        if scope.is_full or resource not in SCOPE_PATHS:
+            tombstones = tombstones.filter(ministry_id=None)
+        else:
+            # Rows moved out of the caller's ministries are gone for them too
+            tombstones = tombstones.filter(Q(ministry_id=None) | Q(ministry_id__in=scope.ministry_ids))
+        tombstones = list(
+            tombstones.order_by('id')
+            .values_list('id', 'object_id', 'ministry_id', 'deleted_at')[:limit + 1]
+        )
+        more_tombstones = len(tombstones) > limit
+        tombstones = tombstones[:limit]
+        for pk, _, _, deleted_at in tombstones:
+            if deleted_at > horizon and not more_tombstones:
+                break
+            tombstone_id = pk
+
+        # ...unless they have moved back into it since
+        returned = queryset.filter(pk__in=[object_id for _, object_id, ministry_id, _ in tombstones if ministry_id])
+        returned = set(returned.values_list('pk', flat=True))
+
+        return Response({
+            'reset': False,
+            'changed': serializer_class(rows, many=True, context={'request': request}).data,
+            'deleted': [object_id for _, object_id, _, _ in tombstones if object_id not in returned],
+            'watermark': encode_watermark(updated_at, last_id, tombstone_id, now),
+            'has_more': more_rows or more_tombstones,
+        })
+
+
+class CheckinSyncView(views.APIView):
+    """
+    `POST /sync/checkins/` with `{"device": "...", "operations": [...]}`:
+    attendance and visitor operations recorded offline, applied together.
+    See `apply_checkins` for how replays and conflicts are resolved.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = CheckinBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = apply_checkins(
+            serializer.validated_data['operations'], serializer.validated_data['device'],
+            members=get_scope(request).filter(Member.objects.all()),
+        )
+        return Response({'results': results})